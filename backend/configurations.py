@@ -1,9 +1,17 @@
 import os
+from functools import lru_cache
 from langchain_groq import ChatGroq
 from langchain_community.chat_message_histories import ChatMessageHistory
 import dotenv
 dotenv.load_dotenv()
 
+
+@lru_cache(maxsize=16)
+def _groq_client(model: str, api_key: str) -> ChatGroq:
+    """One ChatGroq per (model, api key), shared by every GroqLLM instance"""
+    return ChatGroq(api_key=api_key, model=model)
+
+
 class GroqLLM:
     def __init__(self, user_contols_input):
         self.user_controls_input = user_contols_input
@@ -19,10 +27,10 @@ class GroqLLM:
 
 
     def get_base_llm(self):
-        """Return the base ChatGroq LLM instance"""
+        """Return the base ChatGroq LLM instance (reused per model and api key)"""
         groq_api_key = self.user_controls_input["GROQ_API_KEY"]
         selected_groq_model = self.user_controls_input["selected_groq_model"]
-        return ChatGroq(api_key=groq_api_key, model=selected_groq_model)
+        return _groq_client(selected_groq_model, groq_api_key)
 
 if __name__ == "__main__":
     # Example usage
@@ -8,41 +8,95 @@ This script allows interactive testing of:
 """
 
 import os
+import re
 import sys
+import json
 import asyncio
+import signal
+import tempfile
+import threading
+import concurrent.futures
+from collections import OrderedDict, deque
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import AsyncGenerator, Deque, Dict, Optional, Set, Tuple
+import httpx
 from dotenv import load_dotenv
 
-# Add project root to path
-current_file = Path(__file__).resolve()
-project_root = current_file.parent
-if str(project_root) not in sys.path:
-    sys.path.insert(0, str(project_root))
+# Add project root to path (abspath avoids resolve()'s filesystem lookups)
+_project_root_str = os.path.dirname(os.path.abspath(__file__))
+project_root = Path(_project_root_str)
+if _project_root_str not in sys.path:
+    sys.path.insert(0, _project_root_str)
 
 from langgraph_agent.graphs.graph_builder import GraphBuilder
-from langgraph_agent.llms.groq_llm import GroqLLM
-from langgraph_agent.llms.openai_llm import OpenAiLLM
-from langgraph_agent.llms.gemini_llm import GeminiLLM
-from langgraph_agent.llms.ollama_llm import OllamaLLM
 from langgraph_agent.nodes.mcp_chatbot_node import load_mcp_tools
-from langchain_core.messages import HumanMessage, SystemMessage, AIMessage
+from langchain_core.messages import (
+    SystemMessage,
+    AIMessage,
+    AIMessageChunk,
+)
 
 # Load environment variables
 load_dotenv()
 
-# Global MCP tools (loaded once at startup)
-mcp_tools = None
-# In-memory session store: (session_id, use_case) -> list of LangChain messages
-session_store: Dict[str, List] = {}
+# Environment settings, read once at import instead of on every LLM creation
+_ENV = {
+    key: os.getenv(key, default)
+    for key, default in [
+        ("GROQ_API_KEY", ""),
+        ("OPENAI_API_KEY", ""),
+        ("GEMINI_API_KEY", ""),
+        ("OLLAMA_BASE_URL", "http://localhost:11434"),
+        ("CHAT_CONCURRENCY", "8"),
+    ]
+}
+
+
+def _env_int(key: str, minimum: int = 1) -> int:
+    """Read an integer setting from _ENV, failing with a clear message if invalid"""
+    value = _ENV[key]
+    try:
+        number = int(value)
+    except ValueError:
+        raise ValueError(f"{key} must be an integer, got {value!r}") from None
+    if number < minimum:
+        raise ValueError(f"{key} must be at least {minimum}, got {number}")
+    return number
 
 
-async def load_mcp_tools_global():
-    """Load MCP tools once and cache them globally"""
-    global mcp_tools
-    if mcp_tools is not None:
-        return mcp_tools
+# System prompt shared by every console chat turn (built once, never mutated)
+SYSTEM_MESSAGE = SystemMessage(
+    content="You are Medi-Mind, a personal medical assistant. You help users manage their medical details, track health information, answer medical questions, and provide health-related guidance. Always be empathetic, professional, and prioritize user safety. Remind users that you are not a substitute for professional medical advice."
+)
 
+# Global MCP tools (loaded once at startup)
+mcp_tools = None
+# Background task loading the MCP tools (started by start_mcp_tools_preload)
+mcp_tools_task: Optional[asyncio.Task] = None
+# Only the most recent turns (user + assistant pairs) are replayed to the LLM
+MAX_TURNS = 20
+# In-memory session store: (session_id, use_case) -> bounded deque of
+# {"role", "content"} dicts (the graph's add_messages reducer coerces them)
+session_store: "OrderedDict[Tuple[str, str], Deque]" = OrderedDict()
+# Only this many sessions stay in memory; the least recently used are evicted
+# (their history is still on disk and is reloaded on the next turn)
+MAX_SESSIONS = 64
+# Session histories are snapshotted here as JSON so they survive restarts
+SESSIONS_DIR = project_root / ".sessions"
+# Cached LLM instances: (provider, selected_llm) -> LLM
+_llm_cache: Dict[Tuple[str, Optional[str]], object] = {}
+# Pending stdin read (see ainput); None when no read is in flight
+_stdin_read: Optional[concurrent.futures.Future] = None
+# Background graph prewarm tasks still running
+_prewarm_tasks: Set[asyncio.Task] = set()
+# Caps in-flight graph runs so parallel chats (e.g. test_all_providers) stay
+# under provider rate limits instead of triggering 429s and backoff
+_CONCURRENCY = asyncio.Semaphore(_env_int("CHAT_CONCURRENCY"))
+
+
+async def _load_mcp_tools_once():
+    """Load MCP tools from the servers and cache them globally"""
+    global mcp_tools, mcp_tools_task
     try:
         tools = await load_mcp_tools()
         mcp_tools = tools
@@ -50,98 +104,290 @@ async def load_mcp_tools_global():
         return mcp_tools
     except Exception as e:
         print(f"✗ Error loading MCP tools: {e}")
+        # Allow a later call to retry the load
+        mcp_tools_task = None
         return []
 
 
+def start_mcp_tools_preload() -> asyncio.Task:
+    """Start loading MCP tools in the background (no-op if already started)"""
+    global mcp_tools_task
+    if mcp_tools_task is None:
+        mcp_tools_task = asyncio.create_task(_load_mcp_tools_once())
+    return mcp_tools_task
+
+
+async def load_mcp_tools_global():
+    """Load MCP tools once and cache them globally"""
+    if mcp_tools is not None:
+        return mcp_tools
+
+    # Join the background load if it is already running
+    return await start_mcp_tools_preload()
+
+
+def _normalize_provider(provider: str) -> str:
+    """Lower-case a provider name, skipping the copy for already-known names"""
+    return provider if provider in _LLM_FACTORIES else provider.lower()
+
+
 def get_llm(provider: str, selected_llm: Optional[str] = None):
-    """Get LLM instance based on provider"""
-    provider = provider.lower()
+    """Get LLM instance based on provider (cached per provider and model)"""
+    provider = _normalize_provider(provider)
+
+    cache_key = (provider, selected_llm)
+    llm = _llm_cache.get(cache_key)
+    if llm is None:
+        llm = _create_llm(provider, selected_llm)
+        _llm_cache[cache_key] = llm
+    return llm
+
+
+# One async HTTP connection pool shared by every Groq/OpenAI LLM, so TLS
+# connections are kept alive across turns and across providers tested together.
+# Only async calls use it, which is why the graph nodes await ainvoke/astream
+_HTTP = httpx.AsyncClient(
+    timeout=60,
+    limits=httpx.Limits(max_connections=64, max_keepalive_connections=32),
+)
+
 
-    if provider == "groq":
-        user_controls_input = {
-            "GROQ_API_KEY": os.getenv("GROQ_API_KEY", ""),
+async def close_http_client():
+    """Close the shared HTTP client (call once, before the event loop exits)"""
+    await _HTTP.aclose()
+
+
+def _create_groq_llm(selected_llm: Optional[str]):
+    from langgraph_agent.llms.groq_llm import GroqLLM
+
+    return GroqLLM(
+        {
+            "GROQ_API_KEY": _ENV["GROQ_API_KEY"],
             "selected_llm": selected_llm or "openai/gpt-oss-20b",
+            "http_async_client": _HTTP,
         }
-        return GroqLLM(user_controls_input).get_base_llm()
-    elif provider == "openai":
-        user_controls_input = {
-            "OPENAI_API_KEY": os.getenv("OPENAI_API_KEY", ""),
+    ).get_base_llm()
+
+
+def _create_openai_llm(selected_llm: Optional[str]):
+    from langgraph_agent.llms.openai_llm import OpenAiLLM
+
+    return OpenAiLLM(
+        {
+            "OPENAI_API_KEY": _ENV["OPENAI_API_KEY"],
             "selected_llm": selected_llm or "gpt-4o-mini",
+            "http_async_client": _HTTP,
         }
-        return OpenAiLLM(user_controls_input).get_base_llm()
-    elif provider == "gemini":
-        user_controls_input = {
-            "GEMINI_API_KEY": os.getenv("GEMINI_API_KEY", ""),
+    ).get_base_llm()
+
+
+def _create_gemini_llm(selected_llm: Optional[str]):
+    from langgraph_agent.llms.gemini_llm import GeminiLLM
+
+    return GeminiLLM(
+        {
+            "GEMINI_API_KEY": _ENV["GEMINI_API_KEY"],
             "selected_llm": selected_llm or "gemini-2.5-flash",
         }
-        return GeminiLLM(user_controls_input).get_base_llm()
-    elif provider == "ollama":
-        user_controls_input = {
+    ).get_base_llm()
+
+
+def _create_ollama_llm(selected_llm: Optional[str]):
+    from langgraph_agent.llms.ollama_llm import OllamaLLM
+
+    return OllamaLLM(
+        {
             "selected_llm": selected_llm or "gemma3:1b",
-            "OLLAMA_BASE_URL": os.getenv("OLLAMA_BASE_URL", "http://localhost:11434"),
+            "OLLAMA_BASE_URL": _ENV["OLLAMA_BASE_URL"],
         }
-        return OllamaLLM(user_controls_input).get_base_llm()
-    else:
-        raise ValueError(f"Unsupported provider: {provider}")
+    ).get_base_llm()
 
 
-async def chat(
-    message: str,
-    provider: str = "openai",
-    use_case: str = "mcp_chatbot",
-    session_id: str = "default",
-    selected_llm: Optional[str] = None,
+# provider -> factory creating a new LLM instance for that provider.
+# Each factory imports its provider SDK lazily so only the ones used get loaded.
+_LLM_FACTORIES = {
+    "groq": _create_groq_llm,
+    "openai": _create_openai_llm,
+    "gemini": _create_gemini_llm,
+    "ollama": _create_ollama_llm,
+}
+
+
+def _create_llm(provider: str, selected_llm: Optional[str] = None):
+    """Create a new LLM instance for the given provider"""
+    try:
+        factory = _LLM_FACTORIES[provider]
+    except KeyError:
+        raise ValueError(f"Unsupported provider: {provider}") from None
+    return factory(selected_llm)
+
+
+async def _get_or_build_graph(
+    provider: str, selected_llm: Optional[str], use_case: str, tools
 ):
-    """Process a chat message (replicates main.py chat endpoint logic)"""
+    """Return the compiled graph for this provider/model/use case, built once per LLM config,
+    use case and tool set by GraphBuilder's shared cache"""
+    llm = get_llm(provider, selected_llm)
+    graph_builder = GraphBuilder(llm, {"selected_llm": selected_llm or ""})
+    return await graph_builder.setup_graph(use_case, tools=tools)
+
+
+def _session_file(session_key: Tuple[str, str]) -> Path:
+    """Path of the JSON snapshot for a session"""
+    name = re.sub(r"[^\w.-]", "_", f"{session_key[0]}__{session_key[1]}")
+    return SESSIONS_DIR / f"{name}.json"
+
+
+def _get_session(session_key: Tuple[str, str], persist: bool = True) -> Deque:
+    """Return a session's history, loading it from disk on first use if persisted"""
+    history = session_store.get(session_key)
+    if history is not None:
+        session_store.move_to_end(session_key)
+        return history
+
+    # deque evicts the oldest messages once the window is full
+    history = deque(maxlen=2 * MAX_TURNS)
+    if persist:
+        path = _session_file(session_key)
+        try:
+            history.extend(json.loads(path.read_text(encoding="utf-8")))
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError) as e:
+            print(f"✗ Could not load session file {path.name}: {e}")
+
+    session_store[session_key] = history
+    while len(session_store) > MAX_SESSIONS:
+        session_store.popitem(last=False)
+    return history
+
+
+def _persist(session_key: Tuple[str, str], history: Deque):
+    """Write a session's history to its JSON snapshot"""
+    tmp_path = None
     try:
-        # Get LLM
-        llm = get_llm(provider, selected_llm)
+        SESSIONS_DIR.mkdir(exist_ok=True)
+        # Written to a temp file and renamed over the snapshot, so concurrent turns or
+        # a Ctrl-C mid-write never leave a truncated file for _get_session to reject
+        with tempfile.NamedTemporaryFile(
+            "w", encoding="utf-8", dir=SESSIONS_DIR, suffix=".tmp", delete=False
+        ) as f:
+            tmp_path = f.name
+            json.dump(list(history), f)
+        os.replace(tmp_path, _session_file(session_key))
+    except OSError as e:
+        print(f"✗ Could not save session: {e}")
+        if tmp_path is not None:
+            Path(tmp_path).unlink(missing_ok=True)
+
+
+async def _record_turn(
+    session_key: Tuple[str, str], user_msg: dict, response_text: str, persist: bool
+):
+    """Append a finished turn to the session history and save it to disk if persisted"""
+    history = _get_session(session_key, persist)
+    history.append(user_msg)
+    history.append({"role": "assistant", "content": response_text})
+    if not persist:
+        return
+    # Snapshot a copy so later turns can't mutate it while it is being written
+    await asyncio.to_thread(_persist, session_key, deque(history))
+
+
+async def prewarm_graphs(providers, use_cases=("mcp_chatbot",)):
+    """Build the graphs for these providers/use cases ahead of the first chat turn"""
+    # Graphs are cached per tool list, so wait for the background MCP tool load
+    tools = await load_mcp_tools_global()
+    await asyncio.gather(
+        *[
+            _get_or_build_graph(provider, None, use_case, tools)
+            for provider in providers
+            for use_case in use_cases
+        ],
+        return_exceptions=True,
+    )
+
 
-        # Build graph
-        graph_builder = GraphBuilder(llm, {"selected_llm": selected_llm or ""})
+def start_graph_prewarm(*providers: str) -> asyncio.Task:
+    """Prewarm graphs in the background, overlapping with the menu prompt"""
+    task = asyncio.create_task(prewarm_graphs(providers))
+    # Keep a reference so the task isn't garbage collected before it finishes
+    _prewarm_tasks.add(task)
+    task.add_done_callback(_prewarm_tasks.discard)
+    return task
 
-        # Use pre-loaded MCP tools
-        tools = mcp_tools if mcp_tools is not None else await load_mcp_tools_global()
 
-        graph = await graph_builder.setup_graph(use_case, tools=tools)
+async def _prepare_chat(
+    message: str,
+    provider: str,
+    use_case: str,
+    session_id: str,
+    selected_llm,
+    persist: bool,
+):
+    """Resolve graph, session history and input state for one chat turn"""
+    # Use pre-loaded MCP tools
+    tools = mcp_tools if mcp_tools is not None else await load_mcp_tools_global()
 
-        # Resolve session and initialize store if needed
-        session_key = f"{session_id}::{use_case}"
-        if session_key not in session_store:
-            session_store[session_key] = []
+    # Reuse the compiled graph for this provider/model/use case if we have one
+    graph = await _get_or_build_graph(
+        _normalize_provider(provider), selected_llm, use_case, tools
+    )
 
-        # Build messages from stored history and current input
-        messages = [
-            SystemMessage(
-                content="You are Medi-Mind, a personal medical assistant. You help users manage their medical details, track health information, answer medical questions, and provide health-related guidance. Always be empathetic, professional, and prioritize user safety. Remind users that you are not a substitute for professional medical advice."
-            )
-        ]
-        messages.extend(session_store[session_key])
-        user_msg = HumanMessage(content=message)
-        messages.append(user_msg)
+    # Resolve session (loading it from disk if it is persisted and not in memory)
+    session_key = (session_id, use_case)
+    history = _get_session(session_key, persist)
 
-        # Create state with all messages for context
-        state = {"messages": messages}
+    # Build messages from stored history and current input
+    user_msg = {"role": "user", "content": message}
+    messages = [SYSTEM_MESSAGE, *history, user_msg]
+
+    # Create state with all messages for context
+    state = {"messages": messages}
+    return graph, session_key, user_msg, state
+
+
+def _extract_response_text(result: dict) -> str:
+    """Get the text of the last message in a graph result state"""
+    result_messages = result.get("messages", []) if result else []
+    if result_messages:
+        last_message = result_messages[-1]
+        if hasattr(last_message, "content"):
+            return last_message.content
+        elif isinstance(last_message, dict) and "content" in last_message:
+            return last_message["content"]
+        else:
+            return str(last_message)
+    return "No response generated"
+
+
+async def chat(
+    message: str,
+    provider: str = "openai",
+    use_case: str = "mcp_chatbot",
+    session_id: str = "default",
+    selected_llm: Optional[str] = None,
+    persist: bool = True,
+):
+    """
+    Process a chat message (replicates main.py chat endpoint logic).
+    With persist=False the session is kept in memory only, never read from or
+    written to disk (used by the provider and tool tests).
+    """
+    try:
+        graph, session_key, user_msg, state = await _prepare_chat(
+            message, provider, use_case, session_id, selected_llm, persist
+        )
 
         # Process with chatbot graph
-        result = await graph.ainvoke(state)
+        async with _CONCURRENCY:
+            result = await graph.ainvoke(state)
 
         # Extract response
-        result_messages = result.get("messages", [])
-        if result_messages:
-            last_message = result_messages[-1]
-            if hasattr(last_message, "content"):
-                response_text = last_message.content
-            elif isinstance(last_message, dict) and "content" in last_message:
-                response_text = last_message["content"]
-            else:
-                response_text = str(last_message)
-        else:
-            response_text = "No response generated"
+        response_text = _extract_response_text(result)
 
         # Persist history for this session
-        session_store[session_key].append(user_msg)
-        session_store[session_key].append(AIMessage(content=response_text))
+        await _record_turn(session_key, user_msg, response_text, persist)
 
         return response_text
 
@@ -149,11 +395,89 @@ async def chat(
         return f"Error: {str(e)}"
 
 
+async def chat_stream(
+    message: str,
+    provider: str = "openai",
+    use_case: str = "mcp_chatbot",
+    session_id: str = "default",
+    selected_llm: Optional[str] = None,
+    persist: bool = True,
+) -> AsyncGenerator[str, None]:
+    """
+    Same as chat(), but yields the assistant's text as it is generated.
+    Only tokens from the chatbot node (named after the use case) are yielded,
+    so the mood detection LLM call is not echoed to the console.
+    """
+    try:
+        graph, session_key, user_msg, state = await _prepare_chat(
+            message, provider, use_case, session_id, selected_llm, persist
+        )
+
+        result = None
+        async with _CONCURRENCY:
+            async for mode, payload in graph.astream(
+                state, stream_mode=["messages", "values"]
+            ):
+                if mode == "values":
+                    # Keep the latest full state; the last one is the final result
+                    result = payload
+                    continue
+
+                message_chunk, metadata = payload
+                if metadata.get("langgraph_node") != use_case:
+                    continue
+                if isinstance(
+                    message_chunk, (AIMessage, AIMessageChunk)
+                ) and isinstance(message_chunk.content, str):
+                    if message_chunk.content:
+                        yield message_chunk.content
+
+        # Persist the final answer, not the streamed pieces
+        response_text = _extract_response_text(result)
+        await _record_turn(session_key, user_msg, response_text, persist)
+
+    except Exception as e:
+        yield f"Error: {str(e)}"
+
+
 def reset_chat(session_id: str = "default", use_case: str = "mcp_chatbot"):
     """Reset chat session"""
-    session_key = f"{session_id}::{use_case}"
+    session_key = (session_id, use_case)
     session_store.pop(session_key, None)
-    print(f"✓ Chat session '{session_key}' reset")
+    _session_file(session_key).unlink(missing_ok=True)
+    print(f"✓ Chat session '{session_id}::{use_case}' reset")
+
+
+def _start_stdin_read(prompt: str) -> concurrent.futures.Future:
+    """Read one line of stdin on a daemon thread, which never holds up exit"""
+    future = concurrent.futures.Future()
+    # Mark it running so cancelling an awaiting coroutine can't cancel the read
+    future.set_running_or_notify_cancel()
+
+    def read():
+        try:
+            future.set_result(input(prompt))
+        except BaseException as e:
+            future.set_exception(e)
+
+    threading.Thread(target=read, name="console-input", daemon=True).start()
+    return future
+
+
+async def ainput(prompt: str = "") -> str:
+    """Read a line from stdin without blocking the event loop"""
+    global _stdin_read
+    if _stdin_read is None:
+        _stdin_read = _start_stdin_read(prompt)
+    else:
+        # A read abandoned by Ctrl-C is still waiting; it takes this next line
+        print(prompt, end="", flush=True)
+    read = _stdin_read
+    try:
+        return await asyncio.wrap_future(read)
+    finally:
+        if read.done():
+            _stdin_read = None
 
 
 def print_menu():
@@ -172,6 +496,10 @@ def print_menu():
     print("=" * 60)
 
 
+# Inputs that leave the interactive chat loop
+_EXIT_COMMANDS = frozenset({"back", "exit", "quit"})
+
+
 async def interactive_chat(
     provider: str = "openai", use_case: str = "mcp_chatbot", session_id: str = "default"
 ):
@@ -184,26 +512,70 @@ async def interactive_chat(
 
     while True:
         try:
-            user_input = input("You: ").strip()
+            user_input = (await ainput("You: ")).strip()
 
-            if user_input.lower() in ["back", "exit", "quit"]:
+            if user_input.lower() in _EXIT_COMMANDS:
                 break
 
             if not user_input:
                 continue
 
             print("\nAssistant: ", end="", flush=True)
-            response = await chat(user_input, provider, use_case, session_id)
-            print(response)
-            print()
-
-        except KeyboardInterrupt:
+            # Print tokens as they arrive instead of waiting for the full reply
+            async for token in chat_stream(user_input, provider, use_case, session_id):
+                print(token, end="", flush=True)
+            print("\n")
+
+        except asyncio.CancelledError:
+            # Ctrl-C cancels this chat's task (see _run_cancellable_on_sigint);
+            # absorb it here and go back to the menu
+            asyncio.current_task().uncancel()
             print("\n\nReturning to menu...")
             break
         except Exception as e:
             print(f"\nError: {e}\n")
 
 
+async def _run_cancellable_on_sigint(coro):
+    """
+    Run coro in its own task that Ctrl-C cancels, instead of asyncio.Runner's handler,
+    which cancels the main task and turns every later Ctrl-C into KeyboardInterrupt.
+    """
+    task = asyncio.ensure_future(coro)
+    loop = asyncio.get_running_loop()
+    previous_handler = signal.getsignal(signal.SIGINT)
+    try:
+        loop.add_signal_handler(signal.SIGINT, task.cancel)
+    except (NotImplementedError, RuntimeError):
+        # No loop signal handlers (Windows, or not the main thread): Runner's applies
+        return await task
+    try:
+        return await task
+    finally:
+        loop.remove_signal_handler(signal.SIGINT)
+        # remove_signal_handler installs default_int_handler; restore Runner's
+        signal.signal(signal.SIGINT, previous_handler)
+
+
+def _build_batch_prompt(questions) -> str:
+    """Pack several questions into one numbered prompt (one LLM call for all)"""
+    lines = ["Answer each of the following numbered questions in one line:"]
+    lines.extend(f"{i}) {question}" for i, question in enumerate(questions, 1))
+    return "\n".join(lines)
+
+
+def _split_batch_response(response: str, count: int):
+    """Split a numbered batch answer back into one answer per question"""
+    answers = [""] * count
+    for line in response.splitlines():
+        match = re.match(r"\s*(\d+)[).:]\s*(.*)", line)
+        if match:
+            index = int(match.group(1)) - 1
+            if 0 <= index < count:
+                answers[index] = match.group(2).strip()
+    return answers
+
+
 async def test_all_providers():
     """Test all available providers"""
     print("\n" + "=" * 60)
@@ -211,20 +583,43 @@ async def test_all_providers():
     print("=" * 60)
 
     providers = ["groq", "openai", "gemini", "ollama"]
-    test_message = "Say hello in one sentence"
-
-    for provider in providers:
-        try:
-            print(f"\nTesting {provider.upper()}...")
-            response = await chat(
-                test_message,
+    test_questions = [
+        "Say hello in one sentence",
+        "Name one healthy breakfast",
+        "How many hours of sleep do adults need?",
+    ]
+    # All questions go to each provider in a single request instead of one
+    # round trip per question
+    batch_prompt = _build_batch_prompt(test_questions)
+
+    # Dispatch all providers concurrently so total time is the slowest provider,
+    # not the sum of all of them. return_exceptions keeps one failure from
+    # cancelling the others.
+    print(f"\nTesting {', '.join(p.upper() for p in providers)}...")
+    results = await asyncio.gather(
+        *[
+            chat(
+                batch_prompt,
                 provider=provider,
                 use_case="mcp_chatbot",
                 session_id=f"test_{provider}",
+                persist=False,
             )
-            print(f"✓ {provider.upper()}: {response[:100]}...")
-        except Exception as e:
-            print(f"✗ {provider.upper()}: Error - {e}")
+            for provider in providers
+        ],
+        return_exceptions=True,
+    )
+
+    for provider, response in zip(providers, results):
+        if isinstance(response, Exception):
+            print(f"✗ {provider.upper()}: Error - {response}")
+        elif response.startswith("Error:"):
+            print(f"✗ {provider.upper()}: {response[:100]}")
+        else:
+            print(f"✓ {provider.upper()}:")
+            answers = _split_batch_response(response, len(test_questions))
+            for i, answer in enumerate(answers, 1):
+                print(f"    {i}) {answer[:100] or '(no answer)'}")
 
     print("\n" + "=" * 60)
 
@@ -254,6 +649,7 @@ async def test_mcp_tools():
         provider="openai",
         use_case="mcp_chatbot",
         session_id="test_mcp",
+        persist=False,
     )
     print(f"Response: {response}")
 
@@ -264,76 +660,88 @@ async def main():
     print("MEDI-MIND - CONSOLE TESTER")
     print("=" * 60)
 
-    # Load MCP tools at startup
-    print("\nLoading MCP tools...")
-    await load_mcp_tools_global()
+    # Load MCP tools in the background; the first chat turn awaits the same task
+    print("\nLoading MCP tools in the background...")
+    start_mcp_tools_preload()
 
-    # Default settings
-    current_provider = "openai"
-    current_use_case = "mcp_chatbot"
-    current_session_id = "default"
-
-    while True:
-        print_menu()
-        choice = input("\nEnter your choice: ").strip()
-
-        if choice == "1":
-            await interactive_chat(current_provider, "mcp_chatbot", current_session_id)
-
-        elif choice == "2":
-            print("\nAvailable providers:")
-            print("1. groq")
-            print("2. openai")
-            print("3. gemini")
-            print("4. ollama")
-            provider_choice = input("Select provider (1-4): ").strip()
-            providers = {"1": "groq", "2": "openai", "3": "gemini", "4": "ollama"}
-            if provider_choice in providers:
-                current_provider = providers[provider_choice]
-                print(f"✓ Provider set to: {current_provider}")
-            else:
-                print("✗ Invalid choice")
-
-        elif choice == "3":
-            new_session = input("Enter new session ID: ").strip()
-            if new_session:
-                current_session_id = new_session
-                print(f"✓ Session ID set to: {current_session_id}")
-            else:
-                print("✗ Invalid session ID")
-
-        elif choice == "4":
-            reset_chat(current_session_id, current_use_case)
-            print(f"✓ Session reset")
+    try:
+        # Default settings
+        current_provider = "openai"
+        current_use_case = "mcp_chatbot"
+        current_session_id = "default"
+
+        # Build the default graph as soon as the tools arrive, so the first
+        # chat turn only waits on the LLM
+        start_graph_prewarm(current_provider)
+
+        while True:
+            print_menu()
+            choice = (await ainput("\nEnter your choice: ")).strip()
+
+            if choice == "1":
+                await _run_cancellable_on_sigint(
+                    interactive_chat(
+                        current_provider, "mcp_chatbot", current_session_id
+                    )
+                )
+
+            elif choice == "2":
+                print("\nAvailable providers:")
+                print("1. groq")
+                print("2. openai")
+                print("3. gemini")
+                print("4. ollama")
+                provider_choice = (await ainput("Select provider (1-4): ")).strip()
+                providers = {"1": "groq", "2": "openai", "3": "gemini", "4": "ollama"}
+                if provider_choice in providers:
+                    current_provider = providers[provider_choice]
+                    print(f"✓ Provider set to: {current_provider}")
+                    start_graph_prewarm(current_provider)
+                else:
+                    print("✗ Invalid choice")
+
+            elif choice == "3":
+                new_session = (await ainput("Enter new session ID: ")).strip()
+                if new_session:
+                    current_session_id = new_session
+                    print(f"✓ Session ID set to: {current_session_id}")
+                else:
+                    print("✗ Invalid session ID")
+
+            elif choice == "4":
+                reset_chat(current_session_id, current_use_case)
+                print(f"✓ Session reset")
+
+            elif choice == "5":
+                print("\nActive Sessions:")
+                if session_store:
+                    for (sid, uc), history in session_store.items():
+                        print(f"  - {sid}::{uc} ({len(history)} messages)")
+                else:
+                    print("  No active sessions")
+
+            elif choice == "6":
+                await test_all_providers()
+
+            elif choice == "7":
+                await test_mcp_tools()
+
+            elif choice == "8":
+                print("\nGoodbye!")
+                break
 
-        elif choice == "5":
-            print("\nActive Sessions:")
-            if session_store:
-                for key in session_store.keys():
-                    print(f"  - {key} ({len(session_store[key])} messages)")
             else:
-                print("  No active sessions")
-
-        elif choice == "6":
-            await test_all_providers()
-
-        elif choice == "7":
-            await test_mcp_tools()
-
-        elif choice == "8":
-            print("\nGoodbye!")
-            break
-
-        else:
-            print("✗ Invalid choice. Please try again.")
+                print("✗ Invalid choice. Please try again.")
+    finally:
+        # Release pooled connections while the event loop is still running
+        await close_http_client()
 
 
 if __name__ == "__main__":
-    import nest_asyncio
-
-    nest_asyncio.apply()
     try:
-        asyncio.run(main())
+        # One event loop for the whole session; nothing here nests loops
+        with asyncio.Runner() as runner:
+            runner.run(main())
     except KeyboardInterrupt:
         print("\n\nExiting...")
     except Exception as e:
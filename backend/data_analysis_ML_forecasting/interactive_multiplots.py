@@ -11,16 +11,26 @@ What this does
   server-side and embeds both the aggregated history and forecast into each metric HTML.
   -> Because history is pre-aggregated and embedded, switching granularity on the client
      will always show the same values (no client re-aggregation discrepancies).
-- Forecasting: tries SARIMAX (statsmodels) with safe settings (enforce_invertibility=False,
-  enforce_stationarity=False) in a scoped warnings catcher to avoid noisy messages.
-  If statsmodels is not available or fitting fails, falls back to a RandomForest iterative forecast.
+- Forecasting: uses StatsForecast's compiled ARIMA(1,1,1) when statsforecast is installed
+  (much faster per fit); otherwise tries SARIMAX (statsmodels) with safe settings
+  (enforce_invertibility=False, enforce_stationarity=False) in a scoped warnings catcher
+  to avoid noisy messages. If neither is available or fitting fails, falls back to a
+  RandomForest iterative forecast.
 - Contrasting colors: each metric has main color; forecasts use a contrasting (darker) color;
   steps are green, water is blue as requested.
 - No historical backtest (only future forecasts) to keep UI focused and simple.
 - Produces one HTML per metric (interactive Plotly, year + granularity selectors) and a small launcher.
+  Daily histories longer than LTTB_THRESHOLD points are downsampled with LTTB for the
+  embedded chart data (forecasts still use every point).
+  Raw daily values go only to <metric>_data.json next to the HTML; its download button
+  fetches that file instead of inlining the data a second time. Publish the JSON next to
+  the HTML; without it the button falls back to the page's embedded daily series.
+- Each metric HTML carries a hash of its inputs (data + settings); re-running with
+  identical inputs skips that metric's forecasting and file writes.
 
 Usage
   pip install pandas numpy plotly statsmodels scikit-learn
+  pip install statsforecast orjson   # optional, faster ARIMA fits and JSON encoding
   python interactive_health_forecast_pergran.py --out-dir data-analysis/static --days 730 --seed 42 --forecast-days 14
 
 Serve and open
@@ -40,32 +50,68 @@ Notes
 
 from __future__ import annotations
 import argparse
+import hashlib
+import importlib.util
 import json
 import os
 import random
+import re
 import warnings
-from datetime import datetime, timedelta, timezone
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime, timezone
+from functools import lru_cache
 from textwrap import dedent
 
 import numpy as np
 import pandas as pd
 
-# Try SARIMAX; if missing we'll use RandomForest fallback
-try:
-    from statsmodels.tsa.statespace.sarimax import SARIMAX  # type: ignore
-    HAVE_SARIMAX = True
-except Exception:
-    HAVE_SARIMAX = False
+# statsmodels / scikit-learn are slow to import, so they are only loaded the
+# first time a forecast needs them (not for --help or fully cached re-runs)
+@lru_cache(maxsize=None)
+def get_sarimax():
+    """Return the SARIMAX class, or None if statsmodels is missing (RF fallback is used)"""
+    try:
+        from statsmodels.tsa.statespace.sarimax import SARIMAX  # type: ignore
+        return SARIMAX
+    except Exception:
+        return None
+
+@lru_cache(maxsize=None)
+def get_statsforecast_arima():
+    """Return StatsForecast's ARIMA model class, or None if statsforecast is missing"""
+    try:
+        from statsforecast.models import ARIMA  # type: ignore
+        return ARIMA
+    except Exception:
+        return None
+
+@lru_cache(maxsize=None)
+def get_orjson():
+    """Return the orjson module, or None to fall back to the stdlib json encoder"""
+    try:
+        import orjson  # type: ignore
+        return orjson
+    except Exception:
+        return None
 
-# sklearn RF fallback
-try:
-    from sklearn.ensemble import RandomForestRegressor  # type: ignore
-    HAVE_SKRF = True
-except Exception:
-    HAVE_SKRF = False
+# RandomForest fit threads; pool workers set this to 1 since the pool already uses every core
+RF_N_JOBS = -1
+
+@lru_cache(maxsize=None)
+def get_random_forest():
+    """Return RandomForestRegressor, or None if scikit-learn is missing (naive fallback)"""
+    try:
+        from sklearn.ensemble import RandomForestRegressor  # type: ignore
+        return RandomForestRegressor
+    except Exception:
+        return None
 
 PLOTLY_CDN = "https://cdn.plot.ly/plotly-2.24.1.min.js"
 
+# Daily histories longer than this are downsampled (LTTB) before embedding
+LTTB_THRESHOLD = 2000
+LTTB_POINTS = 1500
+
 # Per-metric popup sizes and colors
 METRIC_POPUP_SIZES = {
     "steps": (900, 600),
@@ -95,75 +141,123 @@ def generate_mock_health_data(days: int = 730, seed: int | None = 42) -> pd.Data
     set_seed(seed)
     rng = np.random.default_rng(seed if seed is not None else None)
     end = datetime.now(timezone.utc).replace(hour=0, minute=0, second=0, microsecond=0)
-    dates = [end - timedelta(days=i) for i in reversed(range(days))]
-    df = pd.DataFrame({"date": pd.to_datetime(dates)})
-    n = len(df)
+    dates = pd.date_range(end=end, periods=days, freq="D")
+    n = len(dates)
 
-    base_steps = 5500 + 600 * np.sin(np.linspace(0, 3.5 * np.pi, n))
-    trend = np.linspace(0, 800, n)
+    # Shared time basis; the 4*pi wave is used by both sleep and water
+    t = np.linspace(0, 1, n)
+    wave_4pi = np.sin(4 * np.pi * t)
+
+    base_steps = 5500 + 600 * np.sin(3.5 * np.pi * t)
+    trend = 800 * t
     noise = rng.normal(0, 600, n)
-    df["steps"] = np.clip(base_steps + trend + noise, 0, None).round(0).astype(int)
+    steps = np.clip(base_steps + trend + noise, 0, None).round(0).astype(int)
 
-    df["calories"] = np.clip(1700 + (df["steps"] / 1000) * 70 + rng.normal(0, 60, n), 1200, None).round(0).astype(int)
+    calories = np.clip(1700 + (steps / 1000) * 70 + rng.normal(0, 60, n), 1200, None).round(0).astype(int)
 
-    hr_base = 62 + 1.8 * np.sin(np.linspace(0, 6 * np.pi, n))
+    hr_base = 62 + 1.8 * np.sin(6 * np.pi * t)
     hr_noise = rng.normal(0, 3.2, n)
     spikes = (rng.random(n) < 0.04).astype(int) * rng.integers(8, 20, n)
-    df["heart_rate"] = np.clip(hr_base + hr_noise + spikes, 40, 180).round(1)
+    heart_rate = np.clip(hr_base + hr_noise + spikes, 40, 180).round(1)
 
-    df["spo2"] = np.clip(98 + rng.normal(0, 0.5, n) - 0.2 * (rng.random(n) < 0.02), 90, 100).round(1)
+    spo2 = np.clip(98 + rng.normal(0, 0.5, n) - 0.2 * (rng.random(n) < 0.02), 90, 100).round(1)
 
-    df["sleep_hours"] = np.clip(7 + rng.normal(0, 1.0, n) + 0.3 * np.sin(np.linspace(0, 4 * np.pi, n)), 0, 13).round(2)
+    sleep_hours = np.clip(7 + rng.normal(0, 1.0, n) + 0.3 * wave_4pi, 0, 13).round(2)
 
-    water_base = 2000 + 300 * np.sin(np.linspace(0, 4 * np.pi, n))
+    water_base = 2000 + 300 * wave_4pi
     water_noise = rng.normal(0, 250, n)
-    df["water_ml"] = np.clip(water_base + water_noise, 300, 4000).round(0).astype(int)
-
-    return df
+    water_ml = np.clip(water_base + water_noise, 300, 4000).round(0).astype(int)
+
+    # Build the frame in one go instead of assigning columns one at a time
+    return pd.DataFrame({
+        "date": dates,
+        "steps": steps,
+        "calories": calories,
+        "heart_rate": heart_rate,
+        "spo2": spo2,
+        "sleep_hours": sleep_hours,
+        "water_ml": water_ml,
+    })
 
 # ---------------- Aggregation (server-side explicit freq) ----------------
-def aggregate_series(df: pd.DataFrame, value_col: str, gran: str, agg_type: str) -> pd.Series:
-    s = df[["date", value_col]].copy()
-    s["date"] = pd.to_datetime(s["date"])
-    if gran == "daily":
-        s["period"] = s["date"].dt.normalize(); freq = "D"
-    elif gran == "weekly":
-        s["period"] = (s["date"] - pd.to_timedelta(s["date"].dt.weekday, unit="D")).dt.normalize(); freq = "W-MON"
+def period_buckets(dates, gran: str):
+    """Integer period key (0-based) per row plus the full UTC period index the keys span"""
+    # Everything is bucketed on UTC calendar days; month/quarter keys count from 1970-01
+    if not pd.api.types.is_datetime64_any_dtype(dates):
+        dates = pd.to_datetime(dates)
+    days = dates.to_numpy(dtype="datetime64[ns]").astype("datetime64[D]")
+    if gran == "weekly":
+        # Weeks start on Monday (1970-01-01 was a Thursday, so Monday of week 0 is day -3)
+        keys = (days.astype(np.int64) + 3) // 7
+        start = np.datetime64(int(keys.min()) * 7 - 3, "D"); freq = "W-MON"
     elif gran == "monthly":
-        s["period"] = s["date"].dt.to_period("M").dt.start_time; freq = "MS"
+        keys = days.astype("datetime64[M]").astype(np.int64)
+        start = np.datetime64(int(keys.min()), "M"); freq = "MS"
     elif gran == "quarterly":
-        s["period"] = s["date"].dt.to_period("Q").dt.start_time; freq = "QS"
+        keys = days.astype("datetime64[M]").astype(np.int64) // 3
+        start = np.datetime64(int(keys.min()) * 3, "M"); freq = "QS"
     else:
-        s["period"] = s["date"].dt.normalize(); freq = "D"
-
-    agg = s.groupby("period", sort=True)[value_col].sum() if agg_type == "sum" else s.groupby("period", sort=True)[value_col].mean()
-    idx = pd.to_datetime(agg.index)
-    if idx.tz is None:
-        idx = idx.tz_localize("UTC")
-    agg.index = idx
-    full_idx = pd.date_range(start=agg.index.min(), end=agg.index.max(), freq=freq, tz="UTC")
-    agg = agg.reindex(full_idx)
+        keys = days.astype(np.int64)
+        start = np.datetime64(int(keys.min()), "D"); freq = "D"
+    keys = keys - keys.min()
+    index = pd.date_range(start=pd.Timestamp(start).tz_localize("UTC"), periods=int(keys.max()) + 1, freq=freq)
+    return keys, index
+
+def aggregate_series(df: pd.DataFrame, value_col: str, gran: str, agg_type: str, buckets=None) -> pd.Series:
+    # buckets: precomputed period_buckets(df["date"], gran), shared by metrics on the same dates
+    if buckets is None:
+        buckets = period_buckets(df["date"], gran)
+    return aggregate_values(df[value_col].to_numpy(dtype=np.float64), buckets, agg_type)
+
+def aggregate_values(values: np.ndarray, buckets, agg_type: str) -> pd.Series:
+    """Aggregate a float64 value array per period, given period_buckets() for its dates"""
+    keys, full_idx = buckets
+    valid = ~np.isnan(values)
+    # One O(n) pass per aggregate; the keys already span every period, so no reindex
+    sums = np.bincount(keys[valid], weights=values[valid], minlength=len(full_idx))
     if agg_type == "sum":
-        agg = agg.fillna(0.0)
-    else:
-        agg = agg.fillna(method="ffill").fillna(method="bfill")
+        return pd.Series(sums, index=full_idx)  # empty periods sum to 0
+    counts = np.bincount(keys[valid], minlength=len(full_idx))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        agg = pd.Series(sums / counts, index=full_idx)  # empty periods are NaN
+    # Dense data has no empty periods, so the fills are usually skipped entirely
+    if agg.isna().any():
+        agg = agg.ffill().bfill()
         if agg.isna().any():
             agg = agg.fillna(float(agg.mean(skipna=True) or 0.0))
-    try:
-        agg.index.freq = pd.tseries.frequencies.to_offset(freq)
-    except Exception:
-        pass
-    return agg.astype(float)
+    return agg
 
 # ---------------- Forecasting (FUTURE ONLY) ----------------
+def flat_forecast(series: pd.Series, steps_ahead: int, freq_offset=None):
+    """Repeat the last value (0.0 if empty) as mean and bounds; used for too-short series"""
+    last = float(series.iloc[-1]) if len(series) else 0.0
+    last_dt = series.index[-1] if len(series) else pd.Timestamp(datetime.now(timezone.utc))
+    freq_offset = pd.Timedelta(days=1) if freq_offset is None else freq_offset
+    dates = pd.date_range(start=last_dt + freq_offset, periods=steps_ahead, freq=freq_offset)
+    values = np.full(steps_ahead, last)
+    return dates, values, values, values
+
+def forecast_statsforecast(series: pd.Series, steps_ahead: int = 14):
+    """Forecast future values only using StatsForecast's ARIMA(1,1,1)"""
+    series = series.dropna()
+    if len(series) < 15:
+        return flat_forecast(series, steps_ahead)
+
+    # Same period step as the SARIMAX path (series always carry an explicit freq here)
+    freq_offset = series.index.freq or (series.index[-1] - series.index[-2])
+
+    # Works on the raw float array; no pandas index handling inside the fit
+    model = get_statsforecast_arima()(order=(1, 1, 1))
+    fc = model.forecast(y=series.to_numpy(dtype=np.float64), h=steps_ahead, level=[95])
+    last_date = series.index[-1]
+    dates = [last_date + freq_offset * (i + 1) for i in range(steps_ahead)]
+    return dates, np.asarray(fc["mean"]).tolist(), np.asarray(fc["lo-95"]).tolist(), np.asarray(fc["hi-95"]).tolist()
+
 def forecast_sarimax_safe(series: pd.Series, steps_ahead: int = 14):
     """Forecast future values only using SARIMAX"""
     series = series.dropna()
     if len(series) < 15:
-        last = float(series.iloc[-1]) if len(series) else 0.0
-        last_dt = series.index[-1] if len(series) else pd.Timestamp(datetime.now(timezone.utc))
-        freq_offset = pd.Timedelta(days=1)
-        return [last_dt + freq_offset * (i + 1) for i in range(steps_ahead)], [last] * steps_ahead, [last] * steps_ahead, [last] * steps_ahead
+        return flat_forecast(series, steps_ahead)
     
     # Infer frequency from series
     try:
@@ -179,14 +273,14 @@ def forecast_sarimax_safe(series: pd.Series, steps_ahead: int = 14):
     with warnings.catch_warnings():
         warnings.filterwarnings("ignore", message="No frequency information was provided, so inferred frequency")
         warnings.filterwarnings("ignore", message="Non-invertible starting MA parameters found. Using zeros as starting parameters.")
-        model = SARIMAX(series, order=(1, 1, 1), enforce_stationarity=False, enforce_invertibility=False)
+        model = get_sarimax()(series, order=(1, 1, 1), enforce_stationarity=False, enforce_invertibility=False)
         fit = model.fit(disp=False)
         fc = fit.get_forecast(steps=steps_ahead)
         mean = fc.predicted_mean.tolist()
         ci = fc.conf_int(alpha=0.05)
         lower = ci.iloc[:, 0].tolist()
         upper = ci.iloc[:, 1].tolist()
-        last_date = pd.to_datetime(series.index[-1])
+        last_date = series.index[-1]
         dates = [last_date + freq_offset * (i + 1) for i in range(steps_ahead)]
         return dates, mean, lower, upper
 
@@ -194,10 +288,7 @@ def forecast_rf(series: pd.Series, steps_ahead: int = 14, seed: int | None = 42)
     """Forecast future values only using RandomForest"""
     series = series.dropna()
     if len(series) < 10:
-        last = float(series.iloc[-1]) if len(series) else 0.0
-        last_dt = series.index[-1] if len(series) else pd.Timestamp(datetime.now(timezone.utc))
-        freq_offset = pd.Timedelta(days=1)
-        return [last_dt + freq_offset * (i + 1) for i in range(steps_ahead)], [last] * steps_ahead, [last] * steps_ahead, [last] * steps_ahead
+        return flat_forecast(series, steps_ahead)
     
     # Infer frequency
     try:
@@ -206,44 +297,49 @@ def forecast_rf(series: pd.Series, steps_ahead: int = 14, seed: int | None = 42)
         freq_offset = pd.Timedelta(days=1)
     
     lags = min(7, len(series) - 1)
-    df = pd.DataFrame({"y": series.values}, index=series.index)
-    for lag in range(1, lags + 1):
-        df[f"lag_{lag}"] = df["y"].shift(lag)
-    df["t"] = np.arange(len(df))
-    df = df.dropna()
-    X = df.drop(columns=["y"]).values; y = df["y"].values
+    values = series.to_numpy(dtype=np.float64)
+    # Row i of the window view is values[i:i+lags+1]: lags newest-first, then the target
+    windows = np.lib.stride_tricks.sliding_window_view(values, lags + 1)
+    X = np.hstack([windows[:, -2::-1], np.arange(lags, len(values)).reshape(-1, 1)])
+    y = windows[:, -1]
     
-    if not HAVE_SKRF:
+    RandomForestRegressor = get_random_forest()
+    if RandomForestRegressor is None:
         # Fallback naive
-        last = float(series.iloc[-1])
-        last_dt = series.index[-1]
-        return [last_dt + freq_offset * (i + 1) for i in range(steps_ahead)], [last] * steps_ahead, [last] * steps_ahead, [last] * steps_ahead
+        return flat_forecast(series, steps_ahead, freq_offset)
     
-    rf = RandomForestRegressor(n_estimators=200, random_state=seed, n_jobs=-1)
+    rf = RandomForestRegressor(n_estimators=200, random_state=seed, n_jobs=RF_N_JOBS)
     rf.fit(X, y)
-    last_window = series.iloc[-lags:].tolist()
-    preds = []; per_tree = []
+    # History tail followed by the predictions; the last `lags` entries are the next inputs
+    window = np.empty(lags + steps_ahead)
+    window[:lags] = values[-lags:]
+    # Trees evaluate float32 input; calling tree_.predict directly skips the per-call
+    # input validation of est.predict, which dominated the 200 x steps_ahead calls
+    Xp = np.empty((1, lags + 1), dtype=np.float32)
+    per_tree = np.empty((steps_ahead, len(rf.estimators_)))
     
     for step in range(steps_ahead):
-        feat = [last_window[-lag] for lag in range(1, lags + 1)]
-        feat.append(len(series) + step)
-        Xp = np.array(feat).reshape(1, -1)
-        tree_preds = np.array([est.predict(Xp)[0] for est in rf.estimators_])
-        mean_pred = float(tree_preds.mean())
-        preds.append(mean_pred)
-        per_tree.append(tree_preds)
-        last_window.append(mean_pred); last_window.pop(0)
+        Xp[0, :lags] = window[step:step + lags][::-1]
+        Xp[0, lags] = len(series) + step
+        per_tree[step] = [est.tree_.predict(Xp)[0, 0] for est in rf.estimators_]
+        window[lags + step] = per_tree[step].mean()
     
-    per_tree = np.vstack(per_tree)
-    lower = np.percentile(per_tree, 5, axis=1).tolist()
-    upper = np.percentile(per_tree, 95, axis=1).tolist()
-    last_date = pd.to_datetime(series.index[-1])
+    preds = window[lags:]  # the mean predictions, in step order
+    lower, upper = np.percentile(per_tree, [5, 95], axis=1)
+    last_date = series.index[-1]
     dates = [last_date + freq_offset * (i + 1) for i in range(steps_ahead)]
     return dates, preds, lower, upper
 
 def forecast_future(series: pd.Series, steps_ahead: int = 14, prefer_rf: bool = False, seed: int | None = 42):
     """Forecast FUTURE values only (no historical backtest)"""
-    if prefer_rf or not HAVE_SARIMAX:
+    if prefer_rf:
+        return forecast_rf(series, steps_ahead=steps_ahead, seed=seed)
+    if get_statsforecast_arima() is not None:
+        try:
+            return forecast_statsforecast(series, steps_ahead=steps_ahead)
+        except Exception:
+            pass
+    if get_sarimax() is None:
         return forecast_rf(series, steps_ahead=steps_ahead, seed=seed)
     try:
         return forecast_sarimax_safe(series, steps_ahead=steps_ahead)
@@ -252,6 +348,7 @@ def forecast_future(series: pd.Series, steps_ahead: int = 14, prefer_rf: bool =
 
 # ---------------- HTML template (fixed year filtering) ----------------
 METRIC_HTML = """<!doctype html>
+<!--hash:__HASH__-->
 <html>
 <head>
 <meta charset="utf-8"/>
@@ -417,7 +514,7 @@ button:active {
   }
 }
 </style>
-<script src="__PLOTLY__"></script>
+<script defer src="__PLOTLY__"></script>
 </head>
 <body>
 <div class="container">
@@ -446,7 +543,6 @@ button:active {
 
 <script>
 const DATA_BY_GRAN = __DATA_BY_GRAN__;   // {daily:{history:{dates,values}, forecast:{...}}, ...}
-const RAW_DAILY = __RAW_DAILY__;        // raw daily timestamps + values (for download)
 const MAIN_COLOR = "__MAIN_COLOR__";
 const FORECAST_COLOR = "__FORECAST_COLOR__";
 
@@ -519,7 +615,7 @@ function render(){
   const isBar = "__AGGTYPE__" === "sum" && (gran === 'daily' || gran === 'weekly' || gran === 'monthly' || gran === 'quarterly');
   const baseTrace = isBar 
     ? {x:x, y:y, type:'bar', marker:{color:MAIN_COLOR}, name:'History'} 
-    : {x:x, y:y, mode:'lines+markers', line:{color:MAIN_COLOR}, name:'History'};
+    : {x:x, y:y, type:'scattergl', mode:'lines+markers', line:{color:MAIN_COLOR}, name:'History'}; // WebGL: one draw call for long histories
   const layout = {
     title: "__TITLE__", 
     xaxis:{title:"Period"}, 
@@ -543,14 +639,22 @@ function render(){
         opacity: 0.85
       }
     ]);
-    // Confidence interval with lighter fill
-    const xci = f.dates.concat(f.dates.slice().reverse());
-    const yci = f.upper.concat(f.lower.slice().reverse());
+    // Confidence interval with lighter fill: lower band fills up to the upper
+    // one, so no reversed/concatenated ribbon arrays are built
     Plotly.addTraces('plot', [
       {
-        x: xci, 
-        y: yci, 
-        fill:'toself', 
+        x: f.dates, 
+        y: f.upper, 
+        mode:'lines', 
+        line:{color:'rgba(255,255,255,0)'}, 
+        showlegend: false,
+        hoverinfo: 'skip'
+      },
+      {
+        x: f.dates, 
+        y: f.lower, 
+        mode:'lines', 
+        fill:'tonexty', 
         fillcolor:'rgba(0,0,0,0.04)', 
         line:{color:'rgba(255,255,255,0)'}, 
         name:'95% CI',
@@ -578,15 +682,27 @@ document.addEventListener('DOMContentLoaded', function(){
   document.getElementById('granSelect').addEventListener('change', render);
   document.getElementById('yearSelect').addEventListener('change', render);
   document.getElementById('downloadRaw').addEventListener('click', function(){
-    const blob = new Blob([JSON.stringify(RAW_DAILY, null, 2)], {type:'application/json'});
-    const url = URL.createObjectURL(blob);
-    const a = document.createElement('a'); 
-    a.href = url; 
-    a.download = '__METRIC__' + '_raw_daily.json'; 
-    document.body.appendChild(a); 
-    a.click(); 
-    a.remove(); 
-    URL.revokeObjectURL(url);
+    // Raw daily data is written next to this page, not embedded in it. Where the page is
+    // published without that file (e.g. react_frontend/public) the fetch 404s or returns
+    // the SPA's index.html, so fall back to the embedded daily series (LTTB-thinned when
+    // the history is longer than LTTB_THRESHOLD days).
+    fetch('./' + '__METRIC__' + '_data.json')
+      .then(function(res){ if(!res.ok) throw new Error(res.status); return res.json(); })
+      .catch(function(){
+        const hist = DATA_BY_GRAN.daily.history;
+        return hist.dates.map(function(d, i){ return {timestamp: d, value: hist.values[i]}; });
+      })
+      .then(function(rawDaily){
+        const blob = new Blob([JSON.stringify(rawDaily, null, 2)], {type:'application/json'});
+        const url = URL.createObjectURL(blob);
+        const a = document.createElement('a'); 
+        a.href = url; 
+        a.download = '__METRIC__' + '_raw_daily.json'; 
+        document.body.appendChild(a); 
+        a.click(); 
+        a.remove(); 
+        URL.revokeObjectURL(url);
+      });
   });
   render();
 });
@@ -594,46 +710,189 @@ document.addEventListener('DOMContentLoaded', function(){
 </body></html>
 """
 
+# ---------------- Downsampling ----------------
+def lttb_indices(y: np.ndarray, n_out: int) -> np.ndarray:
+    """Largest-Triangle-Three-Buckets: indices of n_out points of evenly spaced y that keep its visual shape"""
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    # First and last points are always kept; the rest are split into n_out - 2 buckets
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    idx = np.empty(n_out, dtype=np.int64)
+    idx[0], idx[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        # Third triangle vertex: mean of the next bucket (just the last point for the final bucket)
+        nlo, nhi = hi, edges[i + 2] if i + 2 < len(edges) else n
+        avg_x, avg_y = (nlo + nhi - 1) / 2.0, y[nlo:nhi].mean()
+        xs = np.arange(lo, hi)
+        area = np.abs((a - avg_x) * (y[lo:hi] - y[a]) - (a - xs) * (avg_y - y[a]))
+        a = lo + int(np.argmax(area))
+        idx[i + 1] = a
+    return idx
+
 # ---------------- Writer helpers ----------------
+# METRIC_HTML split once into static text (even indices) and __NAME__ placeholders (odd indices);
+# the static text is pre-encoded so pages are streamed to disk without building the full string
+_METRIC_PARTS = [part if i % 2 else part.encode("utf-8") for i, part in enumerate(re.split(r"__([A-Z]+(?:_[A-Z]+)*)__", METRIC_HTML))]
+
+def write_metric_html(values: dict, path):
+    """Write METRIC_HTML to path, filling each placeholder from values (str, or UTF-8 bytes as-is)"""
+    with open(path, "wb") as fh:
+        for i, part in enumerate(_METRIC_PARTS):
+            if i % 2:
+                part = values[part]
+                if isinstance(part, str):
+                    part = part.encode("utf-8")
+            fh.write(part)
+
+def to_json(obj, indent: bool = False) -> bytes:
+    """UTF-8 JSON for obj; orjson encodes in C when installed"""
+    orjson = get_orjson()
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_SERIALIZE_NUMPY | (orjson.OPT_INDENT_2 if indent else 0))
+    return json.dumps(obj, indent=2 if indent else None).encode("utf-8")
+
 def write_json(obj, path):
-    with open(path, "w", encoding="utf-8") as fh:
-        json.dump(obj, fh, indent=2)
+    with open(path, "wb") as fh:
+        fh.write(to_json(obj, indent=True))
+
+def write_text(text, path):
+    # Encode once and write bytes instead of going through a text-mode wrapper
+    with open(path, "wb") as fh:
+        fh.write(text.encode("utf-8"))
+
+def iso_labels(dates) -> list:
+    """isoformat() strings for UTC timestamps, formatted in one vectorized call"""
+    return pd.DatetimeIndex(dates).strftime("%Y-%m-%dT%H:%M:%S+00:00").tolist()
+
+def compact_values(values) -> list:
+    """Round to 3 decimals for the JSON payload; whole-number series become ints (shorter text)"""
+    arr = np.round(np.asarray(values, dtype=float), 3)
+    if np.isfinite(arr).all() and (arr == np.rint(arr)).all():
+        return arr.astype(np.int64).tolist()
+    return arr.tolist()
+
+def inputs_hash(df: pd.DataFrame, *params) -> str:
+    """Fingerprint of the data and build settings that the metric files depend on"""
+    h = hashlib.blake2b(digest_size=16)
+    h.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    h.update(repr(params).encode("utf-8"))
+    return h.hexdigest()
+
+def installed_forecasters() -> tuple:
+    """Optional forecasting libraries that are installed (found without importing them)"""
+    return tuple(name for name in ("statsforecast", "statsmodels", "sklearn") if importlib.util.find_spec(name) is not None)
+
+def has_hash(path: str, data_hash: str) -> bool:
+    """True if the HTML file at path was generated from inputs with this hash"""
+    try:
+        with open(path, "rb") as fh:
+            return fh.read(200).find(data_hash.encode("ascii")) != -1
+    except OSError:
+        return False
+
+# ---------------- Parallel fits ----------------
+GRANULARITIES = ["daily", "weekly", "monthly", "quarterly"]
+
+def _init_fit_worker():
+    # One BLAS thread and one RF job per worker process so parallel fits don't oversubscribe the cores
+    global RF_N_JOBS
+    RF_N_JOBS = 1
+    for var in ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS"):
+        os.environ[var] = "1"
+    try:
+        from threadpoolctl import threadpool_limits  # type: ignore
+        threadpool_limits(1)
+    except Exception:
+        pass
+
+def _fit_one(key, gran, values_bytes, index_bytes, freq, forecast_days, prefer_rf, seed):
+    """Rebuild one aggregated series from raw buffers and forecast it (runs in a worker process)"""
+    index = pd.DatetimeIndex(pd.to_datetime(np.frombuffer(index_bytes, dtype=np.int64), utc=True), freq=freq)
+    series = pd.Series(np.frombuffer(values_bytes, dtype=np.float64).copy(), index=index)
+    f_dates, f_vals, f_lower, f_upper = forecast_future(series, steps_ahead=forecast_days, prefer_rf=prefer_rf, seed=seed)
+    return key, gran, {"dates": iso_labels(f_dates), "values": compact_values(f_vals), "lower": compact_values(f_lower), "upper": compact_values(f_upper)}
+
+def run_fits(aggregated: dict, forecast_days: int, prefer_rf: bool, seed: int | None) -> dict:
+    """Forecast every {key: {gran: series}} entry; returns {(key, gran): forecast dict}"""
+    # Plain bytes instead of pandas objects keep the pickled payload small
+    jobs = [
+        (key, gran, s.to_numpy(dtype=np.float64).tobytes(), s.index.as_unit("ns").asi8.tobytes(), s.index.freqstr, forecast_days, prefer_rf, seed)
+        for key, by_gran in aggregated.items() for gran, s in by_gran.items()
+    ]
+    workers = min(os.cpu_count() or 1, len(jobs))
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_fit_worker) as ex:
+            results = list(ex.map(_fit_one, *zip(*jobs)))
+    else:
+        results = [_fit_one(*job) for job in jobs]
+    return {(key, gran): fc for key, gran, fc in results}
 
 # ---------------- Build outputs ----------------
 def build_outputs(out_dir: str, df: pd.DataFrame, forecast_days: int, seed: int | None, prefer_rf: bool, scale_steps: float):
     os.makedirs(out_dir, exist_ok=True)
 
-    # Scaled steps
-    df_steps = df[["date", "steps"]].copy()
-    df_steps["steps"] = df_steps["steps"].astype(float) * float(scale_steps)
+    # Metrics are plain float64 value arrays over df's dates; no per-metric frames are built
+    steps = df["steps"].to_numpy(dtype=np.float64)
+    if scale_steps != 1.0:
+        steps = steps * float(scale_steps)
 
     metrics = {
-        "steps": (df_steps.rename(columns={"steps":"value"}), "Steps (thousands)", METRIC_COLORS["steps"]["main"], METRIC_COLORS["steps"]["forecast"], "sum", "Steps (thousands)"),
-        "calories": (df[["date","calories"]].rename(columns={"calories":"value"}), "Calories (kcal)", METRIC_COLORS["calories"]["main"], METRIC_COLORS["calories"]["forecast"], "sum", "kcal"),
-        "heart_rate": (df[["date","heart_rate"]].rename(columns={"heart_rate":"value"}), "Heart Rate (BPM)", METRIC_COLORS["heart_rate"]["main"], METRIC_COLORS["heart_rate"]["forecast"], "mean", "BPM"),
-        "spo2": (df[["date","spo2"]].rename(columns={"spo2":"value"}), "SpO2 (%)", METRIC_COLORS["spo2"]["main"], METRIC_COLORS["spo2"]["forecast"], "mean", "%"),
-        "sleep_hours": (df[["date","sleep_hours"]].rename(columns={"sleep_hours":"value"}), "Sleep (hours)", METRIC_COLORS["sleep_hours"]["main"], METRIC_COLORS["sleep_hours"]["forecast"], "mean", "Hours"),
-        "water_ml": (df[["date","water_ml"]].rename(columns={"water_ml":"value"}), "Water (ml)", METRIC_COLORS["water_ml"]["main"], METRIC_COLORS["water_ml"]["forecast"], "sum", "ml"),
+        "steps": (steps, "Steps (thousands)", METRIC_COLORS["steps"]["main"], METRIC_COLORS["steps"]["forecast"], "sum", "Steps (thousands)"),
+        "calories": (df["calories"].to_numpy(dtype=np.float64), "Calories (kcal)", METRIC_COLORS["calories"]["main"], METRIC_COLORS["calories"]["forecast"], "sum", "kcal"),
+        "heart_rate": (df["heart_rate"].to_numpy(dtype=np.float64), "Heart Rate (BPM)", METRIC_COLORS["heart_rate"]["main"], METRIC_COLORS["heart_rate"]["forecast"], "mean", "BPM"),
+        "spo2": (df["spo2"].to_numpy(dtype=np.float64), "SpO2 (%)", METRIC_COLORS["spo2"]["main"], METRIC_COLORS["spo2"]["forecast"], "mean", "%"),
+        "sleep_hours": (df["sleep_hours"].to_numpy(dtype=np.float64), "Sleep (hours)", METRIC_COLORS["sleep_hours"]["main"], METRIC_COLORS["sleep_hours"]["forecast"], "mean", "Hours"),
+        "water_ml": (df["water_ml"].to_numpy(dtype=np.float64), "Water (ml)", METRIC_COLORS["water_ml"]["main"], METRIC_COLORS["water_ml"]["forecast"], "sum", "ml"),
     }
 
-    outputs = {}
-    for key, (dframe, title, main_color, f_color, agg_type, ylabel) in metrics.items():
+    # Metrics whose files were already built from identical inputs (data, settings, page
+    # template and installed forecasters) are skipped
+    data_hash = inputs_hash(
+        df, forecast_days, seed, prefer_rf, scale_steps,
+        METRIC_HTML, PLOTLY_CDN, LTTB_THRESHOLD, LTTB_POINTS, METRIC_COLORS, installed_forecasters(),
+    )
+
+    # Every metric shares df's dates, so period keys and ISO labels are built once per granularity
+    buckets = {gran: period_buckets(df["date"], gran) for gran in GRANULARITIES}
+    iso_dates = {gran: iso_labels(idx) for gran, (_, idx) in buckets.items()}
+
+    aggregated = {}
+    for key, (values, title, main_color, f_color, agg_type, ylabel) in metrics.items():
+        fname = f"{key}_plot.html"
+        if has_hash(os.path.join(out_dir, fname), data_hash) and os.path.exists(os.path.join(out_dir, f"{key}_data.json")):
+            continue
+        aggregated[key] = {gran: aggregate_values(values, buckets[gran], agg_type) for gran in GRANULARITIES}
+
+    # Forecast FUTURE values only; the metric x granularity fits are independent
+    forecasts = run_fits(aggregated, forecast_days, prefer_rf, seed)
+
+    raw_dates = iso_labels(df["date"]) if aggregated else []
+
+    # Files are written on worker threads while the next metric is rendered
+    writer = ThreadPoolExecutor(max_workers=6)
+    pending_writes = []
+    for key, by_gran in aggregated.items():
+        values, title, main_color, f_color, agg_type, ylabel = metrics[key]
+        fname = f"{key}_plot.html"
+
         # Build per-gran history + FUTURE forecasts
         data_by_gran = {}
-        for gran in ["daily", "weekly", "monthly", "quarterly"]:
-            agg_series = aggregate_series(dframe.rename(columns={"date":"date","value":"value"}), "value", gran, agg_type)
-            hist_dates = [d.isoformat() for d in agg_series.index.to_pydatetime()]
-            hist_values = agg_series.values.tolist()
-            
-            # Forecast FUTURE values only
-            f_dates, f_vals, f_lower, f_upper = forecast_future(agg_series, steps_ahead=forecast_days, prefer_rf=prefer_rf, seed=seed)
+        for gran, agg_series in by_gran.items():
+            hist_dates, hist_values = iso_dates[gran], agg_series.to_numpy()
+            if gran == "daily" and len(hist_values) > LTTB_THRESHOLD:
+                # Forecasts above used the full series; only the embedded history is thinned
+                keep = lttb_indices(hist_values, LTTB_POINTS)
+                hist_dates, hist_values = [hist_dates[i] for i in keep], hist_values[keep]
             data_by_gran[gran] = {
-                "history": {"dates": hist_dates, "values": hist_values},
-                "forecast": {"dates": [d.isoformat() for d in f_dates], "values": f_vals, "lower": f_lower, "upper": f_upper}
+                "history": {"dates": hist_dates, "values": compact_values(hist_values)},
+                "forecast": forecasts[(key, gran)]
             }
 
-        # Write metric HTML embedding data_by_gran and raw daily
-        raw_daily = [{"timestamp": r["date"].isoformat(), "value": float(r["value"])} for _, r in dframe.iterrows()]
+        # Write metric HTML embedding data_by_gran (raw daily goes to the JSON file only)
+        raw_daily = [{"timestamp": ts, "value": v} for ts, v in zip(raw_dates, values.tolist())]
         
         # Metric label for badge
         metric_labels = {
@@ -645,23 +904,29 @@ def build_outputs(out_dir: str, df: pd.DataFrame, forecast_days: int, seed: int
             "water_ml": "WATER"
         }
         
-        html = METRIC_HTML.replace("__PLOTLY__", PLOTLY_CDN)\
-                          .replace("__TITLE__", title)\
-                          .replace("__METRIC_LABEL__", metric_labels.get(key, key.upper()))\
-                          .replace("__SUBTITLE__", "Interactive visualization • Switch granularity to view pre-aggregated series with future forecasts")\
-                          .replace("__DATA_BY_GRAN__", json.dumps(data_by_gran))\
-                          .replace("__RAW_DAILY__", json.dumps(raw_daily))\
-                          .replace("__MAIN_COLOR__", main_color)\
-                          .replace("__FORECAST_COLOR__", f_color)\
-                          .replace("__METRIC__", key)\
-                          .replace("__AGGTYPE__", agg_type)\
-                          .replace("__YLABEL__", ylabel)
-        fname = f"{key}_plot.html"
-        with open(os.path.join(out_dir, fname), "w", encoding="utf-8") as fh:
-            fh.write(html)
+        html_values = {
+            "PLOTLY": PLOTLY_CDN,
+            "TITLE": title,
+            "METRIC_LABEL": metric_labels.get(key, key.upper()),
+            "SUBTITLE": "Interactive visualization • Switch granularity to view pre-aggregated series with future forecasts",
+            "DATA_BY_GRAN": to_json(data_by_gran),
+            "MAIN_COLOR": main_color,
+            "FORECAST_COLOR": f_color,
+            "METRIC": key,
+            "AGGTYPE": agg_type,
+            "YLABEL": ylabel,
+            "HASH": data_hash,
+        }
+        pending_writes.append(writer.submit(write_metric_html, html_values, os.path.join(out_dir, fname)))
         # Write raw daily JSON file (also useful for React)
-        write_json(raw_daily, os.path.join(out_dir, f"{key}_data.json"))
-        outputs[key] = fname
+        pending_writes.append(writer.submit(write_json, raw_daily, os.path.join(out_dir, f"{key}_data.json")))
+
+    writer.shutdown(wait=True)
+    for fut in pending_writes:
+        fut.result()  # re-raise any write error
+
+    # In metrics order whether each page was rebuilt or cached, so launcher cards keep their order
+    outputs = {key: f"{key}_plot.html" for key in metrics}
 
     # Launcher
     launcher = ["""<!doctype html>
@@ -827,33 +1092,44 @@ h1 {
         "water_ml": ("💧", "Water Intake", "water-card")
     }
     
+    # One popup table + handler for all cards instead of an inline IIFE per card
+    popups = {}
     for k, fname in outputs.items():
         if k == "launcher":
             continue
-        icon, display_name, card_class = metric_info.get(k, ("📊", k.replace('_',' ').title(), "metric-card"))
         w, h = METRIC_POPUP_SIZES.get(k, (900, 600))
-        launcher.append(f"""
-    <div class="metric-card {card_class}" onclick="(function(){{
-      var w=window.open('./{fname}','{k}Popup','width={w},height={h},resizable=yes,scrollbars=yes'); 
-      if(w) w.focus(); 
-      else alert('⚠️ Popup blocked — please allow popups or open ./{fname} directly');
-    }})()">
+        popups[k] = {"url": f"./{fname}", "w": w, "h": h}
+
+    def card(k):
+        icon, display_name, card_class = metric_info.get(k, ("📊", k.replace('_',' ').title(), "metric-card"))
+        return f"""
+    <div class="metric-card {card_class}" onclick="openPopup('{k}')">
       <div class="metric-icon">{icon}</div>
       <div class="metric-title">{display_name}</div>
       <button class="open-btn">View Dashboard</button>
-      <div class="metric-note">{fname}</div>
-    </div>""")
+      <div class="metric-note">{outputs[k]}</div>
+    </div>"""
+
+    launcher.append("".join(card(k) for k in popups))
     launcher.append("""
   </div>
   <div class="footer">
     📁 Files saved in: """ + os.path.abspath(out_dir) + """
   </div>
 </div>
+<script>
+const POPUPS = """ + json.dumps(popups) + """;
+function openPopup(k){
+  const p = POPUPS[k];
+  const w = window.open(p.url, k + 'Popup', 'width=' + p.w + ',height=' + p.h + ',resizable=yes,scrollbars=yes');
+  if(w) w.focus();
+  else alert('⚠️ Popup blocked — please allow popups or open ' + p.url + ' directly');
+}
+</script>
 </body>
 </html>""")
     launcher_path = os.path.join(out_dir, "health_launcher.html")
-    with open(launcher_path, "w", encoding="utf-8") as fh:
-        fh.write("\n".join(launcher))
+    write_text("\n".join(launcher), launcher_path)
     outputs["launcher"] = "health_launcher.html"
     return outputs
 
@@ -10,25 +10,25 @@ from langchain_mcp_adapters.client import MultiServerMCPClient
 from langgraph.graph import StateGraph
 from langchain_core.messages import HumanMessage, AIMessageChunk
 from langchain_core.tools import StructuredTool
-from typing import AsyncGenerator
+from typing import AsyncGenerator, Optional
+from functools import cache
 from langchain_community.tools.tavily_search import TavilySearchResults
 from dotenv import load_dotenv
+import argparse
+import asyncio
 import os
-
-
-from pathlib import Path
-import sys
-
-current_file = Path(__file__).resolve()
-project_root = current_file.parent.parent
-if str(project_root) not in sys.path:
-    sys.path.insert(0, str(project_root))
+import uuid
 
 from langgraph_agent.mcps.config import mcp_config
-from langgraph_agent.graph import build_agent_graph, AgentState
+from langgraph_agent.graph import build_agent_graph, open_checkpointer, AgentState
 
 load_dotenv()
 
+# Bound once at import; stream_graph_response checks every streamed token against it
+_AIMessageChunk = AIMessageChunk
+TOOL_CALL_PREFIX = "\n\n< TOOL CALL: "
+TOOL_CALL_SUFFIX = " >\n\n"
+
 
 async def stream_graph_response(
     input: AgentState, graph: StateGraph, config: dict = {}
@@ -47,34 +47,44 @@ async def stream_graph_response(
     async for message_chunk, metadata in graph.astream(
         input=input, stream_mode="messages", config=config
     ):
-        if isinstance(message_chunk, AIMessageChunk):
-            if message_chunk.response_metadata:
-                finish_reason = message_chunk.response_metadata.get("finish_reason", "")
-                if finish_reason == "tool_calls":
-                    yield "\n\n"
+        if message_chunk.__class__ is not _AIMessageChunk:
+            continue
 
-            if message_chunk.tool_call_chunks:
-                tool_chunk = message_chunk.tool_call_chunks[0]
+        response_metadata = message_chunk.response_metadata
+        if response_metadata and response_metadata.get("finish_reason") == "tool_calls":
+            yield "\n\n"
 
-                tool_name = tool_chunk.get("name", "")
-                args = tool_chunk.get("args", "")
+        tool_call_chunks = message_chunk.tool_call_chunks
+        if tool_call_chunks:
+            tool_chunk = tool_call_chunks[0]
 
+            # Argument fragments take precedence over the name; chunks with neither yield nothing
+            args = tool_chunk.get("args")
+            if args:
+                yield args
+            else:
+                tool_name = tool_chunk.get("name")
                 if tool_name:
-                    tool_call_str = f"\n\n< TOOL CALL: {tool_name} >\n\n"
-                if args:
-                    tool_call_str = args
+                    yield TOOL_CALL_PREFIX + tool_name + TOOL_CALL_SUFFIX
+        else:
+            yield message_chunk.content
 
-                yield tool_call_str
-            else:
-                yield message_chunk.content
-            continue
 
+@cache
+def _tavily_tool():
+    """Tavily search tool if TAVILY_API_KEY is set, built on first use"""
+    tavily_api_key = os.getenv("TAVILY_API_KEY")
+    if not tavily_api_key:
+        return None
+    return TavilySearchResults(max_results=5, tavily_api_key=tavily_api_key)
 
-async def main():
+
+async def main(thread_id: Optional[str] = None):
     """
     Initialize the MCP client and run the agent conversation loop.
 
     The MultiServerMCPClient allows connection to multiple MCP servers using a single client and config.
+    Passing the thread_id of an earlier session resumes that conversation from the checkpoints.
     """
 
     def multiply(a: int, b: int) -> int:
@@ -86,46 +96,64 @@ async def main():
         """
         return a * b
 
-    client = MultiServerMCPClient(connections=mcp_config["mcpServers"])
-    # the get_tools() method returns a list of tools from all the connected servers
-    tools = await client.get_tools()
-
-    # Add Tavily search tool if API key is available
-    tavily_api_key = os.getenv("TAVILY_API_KEY")
-    if tavily_api_key:
-        tools.append(TavilySearchResults(max_results=5, tavily_api_key=tavily_api_key))
+    def build_local_tools():
+        local_tools = []
+        # Add Tavily search tool if API key is available
+        tavily_tool = _tavily_tool()
+        if tavily_tool is not None:
+            local_tools.append(tavily_tool)
+        # Convert multiply function to a LangChain tool
+        local_tools.append(StructuredTool.from_function(multiply))
+        return local_tools
 
-    # Convert multiply function to a LangChain tool
-    multiply_tool = StructuredTool.from_function(multiply)
-    tools.append(multiply_tool)
+    client = MultiServerMCPClient(connections=mcp_config["mcpServers"])
+    # the get_tools() method returns a list of tools from all the connected servers; it
+    # already connects to them concurrently, and the local tools are built on a worker
+    # thread while those handshakes are in flight
+    mcp_tools, local_tools = await asyncio.gather(
+        client.get_tools(), asyncio.to_thread(build_local_tools)
+    )
+    tools = mcp_tools + local_tools
     print("tools: ", tools)
-    graph = build_agent_graph(tools=tools)
 
-    # pass a config with a thread_id to use memory
-    graph_config = {"configurable": {"thread_id": "1"}}
+    # The saver's SQLite connection lives for this session and is closed when it ends
+    async with open_checkpointer() as checkpointer:
+        graph = build_agent_graph(tools=tools, checkpointer=checkpointer)
 
-    while True:
-        user_input = input("\n\nUSER: ")
-        if user_input in ["quit", "exit"]:
-            break
+        # pass a config with a thread_id to use memory; a new thread unless one is given,
+        # so earlier sessions in the checkpoint database are only replayed when resumed
+        thread_id = thread_id or uuid.uuid4().hex
+        print(f"thread: {thread_id} (resume with --thread-id {thread_id})")
+        graph_config = {"configurable": {"thread_id": thread_id}}
 
-        print("\n ----  USER  ---- \n\n", user_input)
-        print("\n ----  ASSISTANT  ---- \n\n")
+        while True:
+            user_input = input("\n\nUSER: ")
+            if user_input in ["quit", "exit"]:
+                break
 
-        async for response in stream_graph_response(
-            input=AgentState(messages=[HumanMessage(content=user_input)]),
-            graph=graph,
-            config=graph_config,
-        ):
-            print(response, end="", flush=True)
+            print("\n ----  USER  ---- \n\n", user_input)
+            print("\n ----  ASSISTANT  ---- \n\n")
 
+            async for response in stream_graph_response(
+                input=AgentState(messages=[HumanMessage(content=user_input)]),
+                graph=graph,
+                config=graph_config,
+            ):
+                print(response, end="", flush=True)
 
-if __name__ == "__main__":
-    import asyncio
 
+if __name__ == "__main__":
     # only needed if running in an ipykernel
     import nest_asyncio
 
     nest_asyncio.apply()
 
-    asyncio.run(main())
+    parser = argparse.ArgumentParser(description="Chat with the Scout agent")
+    parser.add_argument(
+        "--thread-id",
+        default=os.environ.get("SCOUT_THREAD_ID"),
+        help="resume this conversation thread (default: $SCOUT_THREAD_ID, else a new thread)",
+    )
+    args = parser.parse_args()
+
+    asyncio.run(main(thread_id=args.thread_id))
@@ -1,33 +1,98 @@
 from langchain_openai import ChatOpenAI
 from langgraph.graph import StateGraph, add_messages, START
 from langchain_core.messages import SystemMessage
-from pydantic import BaseModel
+from typing_extensions import TypedDict
 from typing import List, Annotated
 from langgraph.prebuilt import ToolNode, tools_condition
-from langgraph.checkpoint.memory import MemorySaver
+from langgraph.checkpoint.sqlite.aio import AsyncSqliteSaver
 from langchain.tools import BaseTool
+from collections import OrderedDict
+from functools import cache
 import os
 from langgraph_agent.prompts import get_scout_system_prompt
+from langgraph_agent.tools import tool_names_key
 
 
-class AgentState(BaseModel):
+class AgentState(TypedDict):
     messages: Annotated[List, add_messages]
 
 
-def build_agent_graph(tools: List[BaseTool] = []):
-    llm = ChatOpenAI(name="Scout", model="gpt-4.1-mini")
+# Scout conversation checkpoints
+CHECKPOINT_DB = os.environ.get(
+    "SCOUT_CHECKPOINT_DB",
+    os.path.join(
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "checkpoints.db"
+    ),
+)
+
+
+def open_checkpointer():
+    """
+    AsyncSqliteSaver on CHECKPOINT_DB, used as `async with open_checkpointer() as saver:`
+    so its connection belongs to the caller's event loop and is closed on exit.
+    """
+    return AsyncSqliteSaver.from_conn_string(CHECKPOINT_DB)
+
+
+# Tool-bound Scout LLMs keyed by sorted tool names. bind_tools only keeps the tools'
+# JSON schemas, so graphs whose tools share names can reuse one bound LLM.
+_LLM_CACHE: dict = {}
+
+
+@cache
+def _scout_llm() -> ChatOpenAI:
+    """Single ChatOpenAI client, so every Scout graph shares its HTTP connection pool"""
+    return ChatOpenAI(name="Scout", model="gpt-4.1-mini")
+
+
+def _get_llm(tools: List[BaseTool]):
+    """Scout LLM with these tools bound, binding each tool signature once"""
+    tool_sig = tool_names_key(tools)
+    llm = _LLM_CACHE.get(tool_sig)
+    if llm is None:
+        llm = _scout_llm().bind_tools(tools) if tools else _scout_llm()
+        _LLM_CACHE[tool_sig] = llm
+    return llm
+
+
+# Compiled graphs keyed by sorted tool names (like GraphBuilder's cache) and the identity
+# of their checkpointer. A reload of the same MCP servers reuses the graph built from the
+# first load's tool objects; a cached graph holds its checkpointer, so that id can't be reused.
+_GRAPH_CACHE: OrderedDict = OrderedDict()
+_GRAPH_CACHE_SIZE = 32
+
+
+def build_agent_graph(tools: List[BaseTool] = [], checkpointer=None):
+    """Return the compiled Scout graph for these tools, compiling it only once per tool set"""
+    cache_key = (tool_names_key(tools), id(checkpointer))
+    graph = _GRAPH_CACHE.get(cache_key)
+    if graph is not None:
+        _GRAPH_CACHE.move_to_end(cache_key)
+        return graph
+
+    graph = _compile_agent_graph(list(tools), checkpointer)
+    _GRAPH_CACHE[cache_key] = graph
+    while len(_GRAPH_CACHE) > _GRAPH_CACHE_SIZE:
+        _GRAPH_CACHE.popitem(last=False)
+    return graph
+
+
+def _compile_agent_graph(tools: List[BaseTool], checkpointer):
+    llm = _get_llm(tools)
     if tools:
-        llm = llm.bind_tools(tools)
         system_prompt = get_scout_system_prompt(
             working_dir=os.environ.get("MCP_FILESYSTEM_DIR", ""),
         )
     else:
         system_prompt = get_scout_system_prompt()
 
-    def assistant(state: AgentState) -> AgentState:
-        response = llm.invoke([SystemMessage(content=system_prompt)] + state.messages)
-        state.messages.append(response)
-        return state
+    # Built once per graph; every assistant call reuses the same message object
+    system_message = SystemMessage(content=system_prompt)
+
+    def assistant(state: AgentState) -> dict:
+        response = llm.invoke([system_message, *state["messages"]])
+        # Only the new message; the add_messages reducer appends it to the history
+        return {"messages": [response]}
 
     builder = StateGraph(AgentState)
 
@@ -41,7 +106,7 @@ def build_agent_graph(tools: List[BaseTool] = []):
     )
     builder.add_edge("tools", "Scout")
 
-    return builder.compile(checkpointer=MemorySaver())
+    return builder.compile(checkpointer=checkpointer)
 
 
 # visualize graph
@@ -2,14 +2,6 @@ from langgraph.graph import START, END
 from typing import List, Optional
 from langchain.tools import BaseTool
 
-from pathlib import Path
-import sys
-
-current_file = Path(__file__).resolve()
-project_root = current_file.parent.parent.parent
-if str(project_root) not in sys.path:
-    sys.path.insert(0, str(project_root))
-
 from langgraph_agent.nodes.doctor_chatbot_node import DoctorChatbotNode
 
 
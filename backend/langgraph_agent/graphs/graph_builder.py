@@ -1,22 +1,50 @@
+from collections import OrderedDict
 from langgraph.graph import StateGraph
 
-from pathlib import Path
-import sys
 import dotenv
 
-current_file = Path(__file__).resolve()
-project_root = current_file.parent.parent.parent
-if str(project_root) not in sys.path:
-    sys.path.insert(0, str(project_root))
-
 from langgraph_agent.states.chatbotState import (
     ChatbotState,
 )  # ignoring the import error
 from langgraph_agent.graphs.mcp_chatbot_graph import mcp_chatbot_build_graph
 from langgraph_agent.graphs.doctor_chatbot_graph import doctor_chatbot_build_graph
+from langgraph_agent.tools import tool_names_key
 
 dotenv.load_dotenv()
 
+# Compiled graphs keyed by (LLM settings, usecase, tool names), shared by every GraphBuilder
+# since main.py and console_main.py create a new builder per request; least recently used evicted
+_COMPILED: OrderedDict = OrderedDict()
+_COMPILED_SIZE = 32
+
+
+def _freeze(value):
+    """Hashable form of a settings value: dicts/lists as tuples, secrets by value, other
+    unhashable objects by identity (the cached graph keeps its LLM, so ids aren't reused)"""
+    if isinstance(value, dict):
+        return tuple(sorted((str(k), _freeze(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return tuple(_freeze(v) for v in value)
+    if hasattr(value, "get_secret_value"):
+        return ("secret", value.get_secret_value())
+    try:
+        hash(value)
+    except TypeError:
+        return ("id", id(value))
+    return value
+
+
+def _llm_key(llm) -> tuple:
+    """
+    The LLM's class and settings (model, api key, base url, temperature, ...), so two LLMs
+    of the same model but different configuration never share a graph and its bound LLM.
+    """
+    try:
+        settings = llm.model_dump()  # LangChain chat models are pydantic models
+    except Exception:
+        return (type(llm).__qualname__, id(llm))
+    return (type(llm).__qualname__, _freeze(settings))
+
 
 class GraphBuilder:
     def __init__(self, model, user_controls_input: dict):
@@ -25,6 +53,7 @@ class GraphBuilder:
         self.graph_builder = StateGraph(
             ChatbotState
         )  # StateGraph is a class in LangGraph that is used to build the graph
+        self._used_builder = False
 
     async def setup_graph(self, usecase: str, tools=None):
         """
@@ -34,14 +63,28 @@ class GraphBuilder:
             usecase: The use case to set up ("mcp_chatbot" or "doctor_chatbot")
             tools: Optional list of tools for the chatbot
         """
+        cache_key = (_llm_key(self.llm), usecase, tool_names_key(tools))
+        graph = _COMPILED.get(cache_key)
+        if graph is not None:
+            _COMPILED.move_to_end(cache_key)
+            return graph
+
+        # Each graph gets its own StateGraph; nodes can only be added to a builder once
+        graph_builder = (
+            self.graph_builder if not self._used_builder else StateGraph(ChatbotState)
+        )
+        self._used_builder = True
         if usecase == "mcp_chatbot":
-            mcp_chatbot_build_graph(self.graph_builder, self.llm, tools=tools)
+            mcp_chatbot_build_graph(graph_builder, self.llm, tools=tools)
         elif usecase == "doctor_chatbot":
-            doctor_chatbot_build_graph(self.graph_builder, self.llm, tools=tools)
+            doctor_chatbot_build_graph(graph_builder, self.llm, tools=tools)
         else:
             raise ValueError(f"Unsupported use case: {usecase}. Supported use cases: 'mcp_chatbot', 'doctor_chatbot'.")
 
-        return self.graph_builder.compile()
+        graph = _COMPILED[cache_key] = graph_builder.compile()
+        while len(_COMPILED) > _COMPILED_SIZE:
+            _COMPILED.popitem(last=False)
+        return graph
 
 
 if __name__ == "__main__":
@@ -2,17 +2,14 @@ from langgraph.graph import START, END
 from typing import List, Optional
 from langchain.tools import BaseTool
 
-from pathlib import Path
-import sys
-
-current_file = Path(__file__).resolve()
-project_root = current_file.parent.parent.parent
-if str(project_root) not in sys.path:
-    sys.path.insert(0, str(project_root))
-
 from langgraph_agent.nodes.mcp_chatbot_node import MCPChatbotNode
 from langgraph_agent.nodes.mood_detection_node import MoodDetectionNode
 
+# Patient tools are only for doctor_chatbot ("patient_" covers patient_search_/get_/advanced_)
+PATIENT_PREFIXES = ("patient_",)
+# Mood should only be updated by the mood_detection node
+MOOD_EXCLUDE = frozenset({"health_update_mood"})
+
 
 def mcp_chatbot_build_graph(graph_builder, llm, tools: Optional[List[BaseTool]] = None):
     """
@@ -20,7 +17,8 @@ def mcp_chatbot_build_graph(graph_builder, llm, tools: Optional[List[BaseTool]]
     This method initializes a chatbot node using the `MCPChatbotNode` class
     with MCP tools support and integrates it into the graph. The chatbot node
     is set as both the entry and exit point of the graph.
-    Also includes a mood detection node that analyzes conversation and updates mood.
+    Also includes a mood detection node that analyzes conversation and updates mood;
+    it runs in parallel with the chatbot node.
 
     Args:
         graph_builder: The StateGraph instance to add nodes to
@@ -31,38 +29,23 @@ def mcp_chatbot_build_graph(graph_builder, llm, tools: Optional[List[BaseTool]]
     # Also filter out patient tools (patient tools are only for doctor_chatbot)
     chatbot_tools = []
     mood_tools = []
-    mood_tools_to_exclude = ["health_update_mood"]
-    patient_tool_prefixes = [
-        "patient_",
-        "patient_search_",
-        "patient_get_",
-        "patient_advanced_",
-    ]
-
-    if tools:
-        for tool in tools:
-            tool_name = None
-            if hasattr(tool, "name"):
-                tool_name = tool.name
-            elif isinstance(tool, dict):
-                tool_name = tool.get("name")
-
-            # Check if it's a patient tool
-            is_patient_tool = tool_name and any(
-                tool_name.startswith(prefix) for prefix in patient_tool_prefixes
-            )
-
-            # Exclude patient tools from both nodes
-            if is_patient_tool:
-                print(f"[MCP Chatbot Graph] Excluding patient tool: {tool_name}")
-                continue
-
-            # Exclude mood update tools from chatbot (but include in mood detection)
-            if tool_name not in mood_tools_to_exclude:
-                chatbot_tools.append(tool)
-
-            # Mood detection node gets all non-patient tools (including mood update tools)
-            mood_tools.append(tool)
+
+    for tool in tools or ():
+        tool_name = getattr(tool, "name", None) or (
+            tool.get("name") if isinstance(tool, dict) else None
+        )
+
+        # Exclude patient tools from both nodes
+        if tool_name and tool_name.startswith(PATIENT_PREFIXES):
+            print(f"[MCP Chatbot Graph] Excluding patient tool: {tool_name}")
+            continue
+
+        # Exclude mood update tools from chatbot (but include in mood detection)
+        if tool_name not in MOOD_EXCLUDE:
+            chatbot_tools.append(tool)
+
+        # Mood detection node gets all non-patient tools (including mood update tools)
+        mood_tools.append(tool)
 
     # Mood detection node gets filtered tools (no patient tools, but includes mood update tools)
     mcp_chatbot_node = MCPChatbotNode(llm, tools=chatbot_tools)
@@ -72,9 +55,14 @@ def mcp_chatbot_build_graph(graph_builder, llm, tools: Optional[List[BaseTool]]
     graph_builder.add_node("mood_detection", mood_detection_node.process)
     graph_builder.add_node("mcp_chatbot", mcp_chatbot_node.process)
 
-    # Flow: START -> mood_detection -> mcp_chatbot -> END
+    # Flow: START -> (mood_detection | mcp_chatbot) -> END
+    # The chatbot does not read the mood update, so both LLM calls run in the same step;
+    # LangGraph waits for both branches and merges their writes via the add_messages reducer.
+    # Both can write personal_data.json in that step (mood vs. water intake); the health_data
+    # server serializes those writes with a file lock and replaces the file atomically
     graph_builder.add_edge(START, "mood_detection")
-    graph_builder.add_edge("mood_detection", "mcp_chatbot")
+    graph_builder.add_edge(START, "mcp_chatbot")
+    graph_builder.add_edge("mood_detection", END)
     graph_builder.add_edge("mcp_chatbot", END)
 
 
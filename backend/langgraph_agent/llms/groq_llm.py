@@ -11,7 +11,13 @@ class GroqLLM:
         """Return the base ChatGroq LLM instance"""
         groq_api_key = self.user_controls_input["GROQ_API_KEY"]
         selected_groq_model = self.user_controls_input["selected_llm"]
-        return ChatGroq(api_key=groq_api_key, model=selected_groq_model)
+        # Optional shared httpx.AsyncClient so several LLMs reuse one connection pool
+        http_async_client = self.user_controls_input.get("http_async_client")
+        return ChatGroq(
+            api_key=groq_api_key,
+            model=selected_groq_model,
+            http_async_client=http_async_client,
+        )
 
 if __name__ == "__main__":
     # Example usage
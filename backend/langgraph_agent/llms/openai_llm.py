@@ -15,7 +15,13 @@ class OpenAiLLM:
         selected_openai_model = self.user_controls_input.get(
             "selected_llm", "gpt-4.1-mini"
         )
-        return ChatOpenAI(api_key=openai_api_key, model=selected_openai_model)
+        # Optional shared httpx.AsyncClient so several LLMs reuse one connection pool
+        http_async_client = self.user_controls_input.get("http_async_client")
+        return ChatOpenAI(
+            api_key=openai_api_key,
+            model=selected_openai_model,
+            http_async_client=http_async_client,
+        )
 
 
 if __name__ == "__main__":
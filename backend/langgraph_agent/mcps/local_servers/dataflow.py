@@ -1,24 +1,74 @@
-import pandas as pd
 from mcp.server.fastmcp import FastMCP
-from typing import Optional
-import duckdb
+from typing import TYPE_CHECKING, Optional
 import os
 from dotenv import load_dotenv
 import subprocess
 
+if TYPE_CHECKING:
+    import pandas as pd
+
 load_dotenv()
 
 # Initialize FastMCP server
 mcp = FastMCP("dataflow")
 
+
+def read_csv_fast(file_path: str, dtype=None, parse_dates=None) -> "pd.DataFrame":
+    """Read a CSV with the multithreaded pyarrow parser, falling back to the C engine.
+
+    pyarrow is only used for all-numeric files, where both engines return the same
+    frame; an explicit ``dtype`` always uses the C engine, which applies it on parse.
+    """
+    # pandas is imported on first load so the MCP server itself starts quickly
+    import pandas as pd
+
+    frame = None
+    if dtype is None and _is_numeric_csv(file_path):
+        try:
+            frame = pd.read_csv(file_path, engine="pyarrow")
+        except (ImportError, ValueError):
+            # A later block pyarrow can't parse as numbers: use the C engine
+            pass
+    if frame is None:
+        frame = pd.read_csv(file_path, dtype=dtype)
+
+    for column in parse_dates or ():
+        frame[column] = pd.to_datetime(frame[column], format="ISO8601")
+    return frame
+
+
+def _is_numeric_csv(file_path: str) -> bool:
+    """Whether pyarrow infers only int/float columns from the file's first block.
+
+    pyarrow reads text as dates, None-filled strings and null columns where the C engine
+    keeps strings and NaN; converting those back costs more than pyarrow saves.
+    """
+    try:
+        import pyarrow
+        import pyarrow.csv
+    except ImportError:
+        return False
+    try:
+        # A 64 KiB first block is enough to infer types and keeps the check cheap
+        read_options = pyarrow.csv.ReadOptions(block_size=1 << 16)
+        with pyarrow.csv.open_csv(file_path, read_options=read_options) as reader:
+            schema = reader.schema
+    except (OSError, pyarrow.ArrowInvalid, StopIteration):
+        return False
+    return all(
+        pyarrow.types.is_integer(field.type) or pyarrow.types.is_floating(field.type)
+        for field in schema
+    )
+
+
 class DataFlowSession:
     def __init__(self):
-        self.data: Optional[pd.DataFrame]  = None
+        self.data: Optional["pd.DataFrame"] = None
         self.working_dir = os.environ.get("MCP_FILESYSTEM_DIR", None)
 
     async def load_data(self, file_path: str) -> str:
         try:
-            self.data = pd.read_csv(file_path)
+            self.data = read_csv_fast(file_path)
             return f"Data loaded from {file_path}"
         except Exception as e:
             return f"Error loading data: {str(e)}"
@@ -28,6 +78,8 @@ class DataFlowSession:
             return "No data loaded."
         
         try:
+            import duckdb
+
             con = duckdb.connect(database=':memory:')
             con.register('data', self.data)
             result = con.execute(query).fetchdf()
@@ -1,9 +1,18 @@
 import json
+import os
+import tempfile
+from contextlib import contextmanager
 from pathlib import Path
 from typing import Dict, Any
 from mcp.server.fastmcp import FastMCP
 from dotenv import load_dotenv
 
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
 load_dotenv()
 
 # Initialize FastMCP server
@@ -13,6 +22,30 @@ mcp = FastMCP("health_data")
 current_file = Path(__file__).resolve()
 mcps_dir = current_file.parent.parent  # backend/langgraph_agent/mcps
 personal_data_path = mcps_dir / "json_data" / "personal_data.json"
+personal_data_lock_path = personal_data_path.with_suffix(".json.lock")
+
+
+@contextmanager
+def _data_lock():
+    """
+    Exclusive lock around a load-modify-save of personal_data.json. Every MCP client runs
+    its own server process and the chatbot and mood nodes call tools in the same graph step,
+    so without it one process's update overwrites the other's.
+    """
+    with open(personal_data_lock_path, "a+b") as lock_file:
+        if fcntl is not None:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+        else:
+            lock_file.seek(0)
+            msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+            else:
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
 
 
 class HealthDataManager:
@@ -38,13 +71,25 @@ class HealthDataManager:
             self.data = {}
 
     def _save_data(self) -> bool:
-        """Save health data to JSON file."""
+        """Save health data to JSON file (temp file + rename, so readers never see a partial file)."""
+        tmp_path = None
         try:
-            with open(personal_data_path, "w", encoding="utf-8") as f:
+            with tempfile.NamedTemporaryFile(
+                "w",
+                encoding="utf-8",
+                dir=personal_data_path.parent,
+                prefix=".personal_data.",
+                suffix=".tmp",
+                delete=False,
+            ) as f:
+                tmp_path = f.name
                 json.dump(self.data, f, indent=6, ensure_ascii=False)
+            os.replace(tmp_path, personal_data_path)
             return True
         except Exception as e:
             print(f"Error saving personal_data.json: {e}")
+            if tmp_path and os.path.exists(tmp_path):
+                os.remove(tmp_path)
             import traceback
 
             traceback.print_exc()
@@ -80,7 +125,12 @@ class HealthDataManager:
 
     def update_water_intake(self, cups: int) -> Dict[str, Any]:
         """Update water intake and save to file."""
-        self._load_data()  # Get latest data first
+        with _data_lock():
+            self._load_data()  # Get latest data first
+            return self._write_water_intake(cups)
+
+    def _write_water_intake(self, cups: int) -> Dict[str, Any]:
+        """Set water intake on the loaded data and save it; caller holds _data_lock."""
         self.data["Water_Intake_cups"] = max(0, cups)  # Ensure non-negative
 
         # Recalculate and update energy level
@@ -100,17 +150,19 @@ class HealthDataManager:
 
     def increment_water_intake(self, cups: int = 1) -> Dict[str, Any]:
         """Increment water intake by specified cups."""
-        self._load_data()
-        current = self.data.get("Water_Intake_cups", 0)
-        new_value = current + cups
-        return self.update_water_intake(new_value)
+        with _data_lock():
+            self._load_data()
+            current = self.data.get("Water_Intake_cups", 0)
+            new_value = current + cups
+            return self._write_water_intake(new_value)
 
     def decrement_water_intake(self, cups: int = 1) -> Dict[str, Any]:
         """Decrement water intake by specified cups."""
-        self._load_data()
-        current = self.data.get("Water_Intake_cups", 0)
-        new_value = max(0, current - cups)
-        return self.update_water_intake(new_value)
+        with _data_lock():
+            self._load_data()
+            current = self.data.get("Water_Intake_cups", 0)
+            new_value = max(0, current - cups)
+            return self._write_water_intake(new_value)
 
     def update_mood(self, mood: str) -> Dict[str, Any]:
         """Update mood and save to file."""
@@ -124,23 +176,24 @@ class HealthDataManager:
                 "valid_moods": valid_moods,
             }
 
-        self._load_data()  # Get latest data first
-        self.data["mood"] = mood_capitalized
-
-        # Recalculate and update energy level
-        water_intake = self.data.get("Water_Intake_cups", 0)
-        energy_level = self._calculate_energy_level(mood_capitalized, water_intake)
-        self.data["Energy_Level"] = energy_level
-
-        if self._save_data():
-            return {
-                "status": "success",
-                "message": f"Mood updated to {mood_capitalized}",
-                "mood": self.data["mood"],
-                "Energy_Level": energy_level,
-            }
-        else:
-            return {"status": "error", "message": "Failed to save mood update"}
+        with _data_lock():
+            self._load_data()  # Get latest data first
+            self.data["mood"] = mood_capitalized
+
+            # Recalculate and update energy level
+            water_intake = self.data.get("Water_Intake_cups", 0)
+            energy_level = self._calculate_energy_level(mood_capitalized, water_intake)
+            self.data["Energy_Level"] = energy_level
+
+            if self._save_data():
+                return {
+                    "status": "success",
+                    "message": f"Mood updated to {mood_capitalized}",
+                    "mood": self.data["mood"],
+                    "Energy_Level": energy_level,
+                }
+            else:
+                return {"status": "error", "message": "Failed to save mood update"}
 
 
 # Initialize the manager
@@ -1,6 +1,4 @@
 import os
-import sys
-from pathlib import Path
 from dotenv import load_dotenv
 from typing import List, Optional
 from langchain.tools import BaseTool
@@ -8,12 +6,6 @@ from langchain_core.messages import SystemMessage
 from langchain_mcp_adapters.client import MultiServerMCPClient
 from langchain_core.messages import AIMessage
 
-# Add project root to path
-current_file = Path(__file__).resolve()
-project_root = current_file.parent.parent.parent
-if str(project_root) not in sys.path:
-    sys.path.insert(0, str(project_root))
-
 from langgraph_agent.states.chatbotState import ChatbotState
 from langgraph_agent.prompts import get_doctor_system_prompt
 from langgraph_agent.mcps.config import mcp_config
@@ -76,8 +68,8 @@ class DoctorChatbotNode:
         while iteration < max_tool_iterations:
             iteration += 1
 
-            # Get response from LLM
-            response = self.llm.invoke(messages)
+            # Get response from LLM (awaited, so other nodes and chats keep running)
+            response = await self.llm.ainvoke(messages)
             print("Response from LLM:", response)
             # Ensure response is an AIMessage
             if not isinstance(response, AIMessage):
@@ -1,6 +1,4 @@
 import os
-import sys
-from pathlib import Path
 from dotenv import load_dotenv
 from typing import List, Optional
 from langchain.tools import BaseTool
@@ -9,13 +7,7 @@ from langchain_mcp_adapters.client import MultiServerMCPClient
 from langchain_community.tools.tavily_search import TavilySearchResults
 from langchain_core.tools import StructuredTool
 from langgraph.prebuilt import ToolNode
-from langchain_core.messages import AIMessage
-
-# Add project root to path
-current_file = Path(__file__).resolve()
-project_root = current_file.parent.parent.parent
-if str(project_root) not in sys.path:
-    sys.path.insert(0, str(project_root))
+from langchain_core.messages import AIMessage, message_chunk_to_message
 
 from langgraph_agent.states.chatbotState import ChatbotState
 from langgraph_agent.prompts import get_medi_mind_system_prompt
@@ -76,8 +68,17 @@ class MCPChatbotNode:
         while iteration < max_tool_iterations:
             iteration += 1
 
-            # Get response from LLM
-            response = self.llm.invoke(messages)
+            # Stream the response from the LLM (awaited, so other nodes and chats keep
+            # running); stream_mode="messages" callers see each token as it arrives
+            response = None
+            async for chunk in self.llm.astream(messages):
+                response = chunk if response is None else response + chunk
+            # Merged chunks carry the full content and parsed tool calls
+            response = (
+                message_chunk_to_message(response)
+                if response is not None
+                else AIMessage(content="")
+            )
             print("Response from LLM:", response)
             # Ensure response is an AIMessage
             if not isinstance(response, AIMessage):
@@ -1,17 +1,9 @@
 import os
-import sys
-from pathlib import Path
 from typing import List, Optional
 from langchain.tools import BaseTool
 from langchain_core.messages import HumanMessage
 from dotenv import load_dotenv
 
-# Add project root to path
-current_file = Path(__file__).resolve()
-project_root = current_file.parent.parent.parent
-if str(project_root) not in sys.path:
-    sys.path.insert(0, str(project_root))
-
 from langgraph_agent.states.chatbotState import ChatbotState
 
 load_dotenv()
@@ -133,7 +125,8 @@ Respond with ONLY one word: Happy, Sad, Surprised, Angry, or None if the mood ca
 """
 
         try:
-            response = self.llm.invoke(mood_detection_prompt)
+            # Awaited so the chatbot node's LLM call runs at the same time
+            response = await self.llm.ainvoke(mood_detection_prompt)
             mood = None
 
             if hasattr(response, "content"):
@@ -239,13 +232,14 @@ Respond with ONLY one word: Happy, Sad, Surprised, Angry, or None if the mood ca
             state: The chatbot state containing messages
 
         Returns:
-            Updated state with mood information
+            Mood information only; messages are not echoed back, so this node can run
+            in parallel with the chatbot without rewriting the message history
         """
         messages = list(state.get("messages", []))
 
         # Only process if there are messages
         if not messages:
-            return state
+            return {}
 
         # Get current mood first
         current_mood = await self._get_current_mood()
@@ -257,7 +251,7 @@ Respond with ONLY one word: Happy, Sad, Surprised, Angry, or None if the mood ca
             # Only update if mood is different from current mood
             if current_mood and detected_mood.lower() == current_mood.lower():
                 # Same mood, no update needed
-                return state
+                return {}
 
             # Update mood via MCP (when different)
             update_success = await self._update_mood_via_mcp(detected_mood)
@@ -267,16 +261,16 @@ Respond with ONLY one word: Happy, Sad, Surprised, Angry, or None if the mood ca
                     f"\n[Mood Detection] Mood detected: {detected_mood} (was: {current_mood}) - Updated via MCP\n"
                 )
                 # Return state with mood information
-                return {**state, "detected_mood": detected_mood, "mood_updated": True}
+                return {"detected_mood": detected_mood, "mood_updated": True}
             else:
                 print(
                     f"\n[Mood Detection] Detected mood: {detected_mood} - Failed to update via MCP\n"
                 )
-                return {**state, "detected_mood": detected_mood, "mood_updated": False}
+                return {"detected_mood": detected_mood, "mood_updated": False}
         # No mood detected - this is normal, don't log every time
 
-        # Return state unchanged (mood update is side effect)
-        return state
+        # No state change (mood update is side effect)
+        return {}
 
 
 if __name__ == "__main__":
@@ -1,6 +1,6 @@
-from typing_extensions import TypedDict, List
+from typing_extensions import NotRequired, TypedDict, List
 from langgraph.graph.message import add_messages
-from typing import Annotated
+from typing import Annotated, Optional
 
 
 class ChatbotState(TypedDict):
@@ -10,3 +10,6 @@ class ChatbotState(TypedDict):
     """
 
     messages: Annotated[List, add_messages]
+    # Set by the mood detection node when it detects a new mood
+    detected_mood: NotRequired[Optional[str]]
+    mood_updated: NotRequired[bool]
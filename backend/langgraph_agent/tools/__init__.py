@@ -0,0 +1,6 @@
+def tool_names_key(tools) -> tuple:
+    """
+    Cache key for a tool list: the sorted tool names. Lists whose tools share names
+    (e.g. the same MCP servers loaded again) share one key, and no tools is ().
+    """
+    return tuple(sorted(getattr(tool, "name", "") for tool in tools or ()))